@@ -1,4 +1,3 @@
-import torch
 import os
 
 # --------------------------------------------------------------------------
@@ -29,18 +28,32 @@ MODEL_NAME = "prajjwal1/bert-tiny"
 TOKENIZER_NAME = "prajjwal1/bert-tiny"
 
 EPOCHS = 3
-N_CLASSES = 6
+MERGE_LABELS = True  # scores 0-5 merged into Negative/Neutral/Positive (SENTIMENT_MAPPING_3_LABEL_VERSION) for training, evaluation and serving
+N_CLASSES = 6  # classifier head width (checkpoint layout); only the classes of the label map are trained and served
 DROPOUT = 0.3
 MAX_LEN = 64
+SMALL_FRAC = 0.05  # share of the dataset main2 trains on (reduced for faster runs)
 TEST_SIZE = 0.1
 VAL_SIZE = 0.1
 BATCH_SIZE = 32
 LEARNING_RATE = 5e-5
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+USE_BF16 = os.getenv("USE_BF16", "0") == "1"  # bfloat16 autocast in train_epoch
+GRAD_ACCUM_STEPS = int(os.getenv("GRAD_ACCUM_STEPS", "1"))  # batches per optimizer step
+LOG_INTERVAL = 50  # batches between loss/accuracy syncs in train_epoch
+BUCKET_BY_LENGTH = True  # group similar-length reviews in training batches
+NUM_WORKERS = int(os.getenv("NUM_WORKERS", "2"))  # DataLoader worker processes (0 = main process)
+PREFETCH_FACTOR = 4  # batches prepared ahead by each worker
+CLEAN_TEXT_N_JOBS = int(os.getenv("CLEAN_TEXT_N_JOBS", "1"))  # processes used by clean_texts
+COMPILE_INFERENCE = os.getenv("COMPILE_INFERENCE", "0") == "1"  # compiled eval forward (API + evaluate)
+COMPILE_METHOD = os.getenv("COMPILE_METHOD", "inductor")  # "inductor" (torch.compile) or "torchscript" (trace + freeze)
+DDP_WORLD_SIZE = int(os.getenv("DDP_WORLD_SIZE", "1"))  # local training processes (gloo DDP when > 1)
+DDP_MASTER_PORT = os.getenv("DDP_MASTER_PORT", "29500")
 
 # --------------------------------------------------------------------------
 # Real Dataset paths
 DATASET_PATH = "Dataset/text.txt"
+PARQUET_DATASET_PATH = "Dataset/text.parquet"  # written by src.model.convert_dataset
+READ_CHUNK_ROWS = 100_000  # rows parsed at a time when streaming the dataset
 
 # --------------------------------------------------------------------------
 # Model config
@@ -48,9 +61,59 @@ DATASET_PATH = "Dataset/text.txt"
 # outpus paths
 MODEL_TRAINING_OUTPUT_DIR = "outputs/training_evaluation/training"
 MODEL_EVALUATION_OUTPUT_DIR = "outputs/training_evaluation/evaluation"
+TOKEN_CACHE_DIR = "outputs/token_cache"  # memory-mapped pre-tokenized datasets
+BEST_MODEL_PATH = os.getenv("BEST_MODEL_PATH", os.path.join("outputs", "best_model.pth"))
+QUANTIZED_MODEL_PATH = os.getenv(
+    "QUANTIZED_MODEL_PATH", os.path.splitext(BEST_MODEL_PATH)[0] + ".int8.pth"
+)  # dynamic int8 variant, written by src.model.quantize
+SERVING_MODEL_DIR = os.getenv("SERVING_MODEL_DIR", os.path.join("outputs", "serving_model"))  # config + safetensors + tokenizer
+ONNX_EXPORT_DIR = os.getenv("ONNX_EXPORT_DIR", os.path.join("outputs", "onnx"))  # model.onnx + tokenizer
+TRAINING_CHECKPOINT_PATH = os.path.join("outputs", "training_checkpoint.pth")  # resumable state
+HF_REPO_ID = "Adelanseur/MLOps-Project"
+
+# --------------------------------------------------------------------------
+# Serving config
+MODEL_VERSION = os.getenv("MODEL_VERSION", "1.0.0")
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")  # "torch" or "onnx" (ONNX Runtime, no torch)
+SERVE_QUANTIZED = os.getenv("SERVE_QUANTIZED", "0") == "1"  # serve QUANTIZED_MODEL_PATH (int8, CPU)
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "16"))  # max requests per forward pass
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))  # max wait for a batch to fill
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "64"))  # texts per forward pass on /predict/batch
+BULK_MAX_TEXTS = int(os.getenv("BULK_MAX_TEXTS", "10000"))  # max texts per /predict/batch call
+# COMPILE_INFERENCE: batch sizes whose graphs (every sequence length) are built before the model
+# reports ready; default: every micro-batch size and full bulk chunks, other sizes compile on first use
+COMPILE_WARMUP_BATCH_SIZES = [
+    int(n) for n in os.getenv("COMPILE_WARMUP_BATCH_SIZES", "").split(",") if n.strip()
+] or list(range(1, BATCH_MAX_SIZE + 1)) + [BULK_CHUNK_SIZE]
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))  # 0 disables the cache
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600"))
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "1"))  # pre-forked workers sharing one model (src.api.prefork)
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "0"))  # intra-op threads per worker; 0: cgroup CPU limit / MAX_WORKERS
+INFERENCE_EXECUTOR_WORKERS = int(os.getenv("INFERENCE_EXECUTOR_WORKERS", "1"))  # forward passes run concurrently per worker
+MAX_IN_FLIGHT_REQUESTS = int(os.getenv("MAX_IN_FLIGHT_REQUESTS", "64"))  # per worker, over budget -> 429; 0 disables
+MAX_QUEUE_DEPTH = int(os.getenv("MAX_QUEUE_DEPTH", "48"))  # texts waiting for a micro-batch (3 batches), over budget -> 429; 0 disables
+SHED_RETRY_AFTER_SECONDS = int(os.getenv("SHED_RETRY_AFTER_SECONDS", "1"))
+READINESS_RECOVERY_RATIO = float(os.getenv("READINESS_RECOVERY_RATIO", "0.5"))  # saturated pod is ready again below this share of its budget
+MEMORY_REPORT_INTERVAL_SECONDS = float(os.getenv("MEMORY_REPORT_INTERVAL_SECONDS", "300"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
 # -------------------------------------------------------------------------
 # Test dataset folder path
 TEST_DATA_DIR = "dataset/test_datasets"  # folder containing test data files
 os.makedirs(TEST_DATA_DIR, exist_ok=True)
 
+
+# --------------------------------------------------------------------------
+# DEVICE ("cuda" or "cpu") is resolved on first access, so that importing
+# config doesn't import torch (serving app startup, ONNX Runtime backend)
+def __getattr__(name):
+    if name == "DEVICE":
+        global DEVICE
+        if os.getenv("INFERENCE_BACKEND", "torch") == "onnx":
+            DEVICE = "cpu"
+        else:
+            import torch
+
+            DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+        return DEVICE
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
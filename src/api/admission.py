@@ -0,0 +1,159 @@
+import multiprocessing
+
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from prometheus_client import Counter
+from starlette.responses import JSONResponse
+
+import config
+from src.api.metrics import in_flight_gauge
+
+shed_counter = Counter(
+    'requests_shed_total',
+    'Prediction requests rejected with 429 because the worker was over budget',
+    ['endpoint', 'reason'],
+)
+
+
+class AdmissionController:
+    """
+    Concurrency and queue budget of one serving worker.
+
+    A request is admitted while fewer than `max_in_flight` prediction requests
+    are being handled and fewer than `max_queue_depth` texts wait for a
+    forward pass; otherwise it's shed right away (429 + Retry-After) instead
+    of queueing until every client times out.
+
+    Readiness is pod-wide: the in-flight count of all pre-forked workers is
+    kept in shared memory (allocated here, before the fork). The pod turns
+    saturated, and /health not ready, once it reaches `max_in_flight *
+    workers`, and stays so until it drains to `recovery_ratio` of that, so
+    one busy worker doesn't pull the pod out of the Service and pods don't
+    flap on every probe.
+
+    The per-worker counter is only used from the event loop and needs no lock.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = config.MAX_IN_FLIGHT_REQUESTS,
+        max_queue_depth: int = config.MAX_QUEUE_DEPTH,
+        queue_depth: Callable[[], int] = lambda: 0,
+        retry_after_seconds: int = config.SHED_RETRY_AFTER_SECONDS,
+        workers: int = config.MAX_WORKERS,
+        recovery_ratio: float = config.READINESS_RECOVERY_RATIO,
+    ):
+        """
+        Args:
+            max_in_flight (int): Prediction requests handled at once (0: no limit).
+            max_queue_depth (int): Texts allowed to wait for a forward pass (0: no limit).
+            queue_depth (Callable): Returns the current number of waiting texts.
+            retry_after_seconds (int): Sent as `Retry-After` on 429 responses.
+            workers (int): Worker processes sharing the pod's budget.
+            recovery_ratio (float): Share of the pod budget in flight below which
+                a saturated pod reports ready again.
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue_depth = max_queue_depth
+        self.queue_depth = queue_depth
+        self.retry_after_seconds = retry_after_seconds
+        self.workers = workers
+        self.recovery_ratio = recovery_ratio
+        self.in_flight = 0
+        # [requests in flight in the whole pod, pod saturated (0/1)], shared across fork()
+        self._pod_state = multiprocessing.Array("i", 2)
+
+    def saturation(self) -> Optional[str]:
+        """Which budget is used up ("concurrency" or "queue"), or None."""
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return "concurrency"
+        if self.max_queue_depth and self.queue_depth() >= self.max_queue_depth:
+            return "queue"
+        return None
+
+    def try_acquire(self, endpoint: str) -> Optional[str]:
+        """
+        Admits one request, or returns why it was shed (and counts it in
+        `requests_shed_total`). Every admitted request must call `release`.
+        """
+        reason = self.saturation()
+        if reason is not None:
+            shed_counter.labels(endpoint=endpoint, reason=reason).inc()
+            return reason
+        self.in_flight += 1
+        in_flight_gauge.inc()
+        self._update_pod_state(+1)
+        return None
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        in_flight_gauge.dec()
+        self._update_pod_state(-1)
+
+    def _update_pod_state(self, delta: int) -> bool:
+        with self._pod_state.get_lock():
+            self._pod_state[0] += delta
+            capacity = self.max_in_flight * self.workers
+            if capacity:
+                if self._pod_state[0] >= capacity:
+                    self._pod_state[1] = 1
+                elif self._pod_state[0] <= capacity * self.recovery_ratio:
+                    self._pod_state[1] = 0
+            return bool(self._pod_state[1])
+
+    @property
+    def pod_in_flight(self) -> int:
+        return self._pod_state[0]
+
+    def pod_saturated(self) -> bool:
+        """
+        Whether the pod as a whole is saturated (for readiness), with
+        hysteresis: set at the full pod budget, cleared at `recovery_ratio` of it.
+        """
+        return self._update_pod_state(0)
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying an `AdmissionController` to the prediction
+    endpoints. A request holds its slot until the response is fully sent,
+    streamed /predict/batch bodies included, and is shed before its body is
+    even read.
+    """
+
+    def __init__(self, app, controller: AdmissionController, endpoints: Dict[str, str]):
+        """
+        Args:
+            app: The ASGI app to wrap.
+            controller (AdmissionController): Budget shared by the endpoints.
+            endpoints (Dict[str, str]): Path -> endpoint name used in metrics.
+        """
+        self.app = app
+        self.controller = controller
+        self.endpoints = endpoints
+
+    async def __call__(self, scope, receive, send):
+        endpoint = self.endpoints.get(scope["path"]) if scope["type"] == "http" else None
+        if endpoint is None:
+            await self.app(scope, receive, send)
+            return
+
+        reason = self.controller.try_acquire(endpoint)
+        if reason is not None:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": {
+                    "status": "error",
+                    "error_details": f"Server overloaded ({reason} budget used up), retry later.",
+                    "timestamp": datetime.utcnow().isoformat(),
+                }},
+                headers={"Retry-After": str(self.controller.retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from concurrent.futures import Executor
+from time import perf_counter
+from typing import Any, Callable, List, Optional
+
+from prometheus_client import Histogram
+
+import config
+from src.api.metrics import batch_queue_depth_gauge
+
+batch_size_histogram = Histogram(
+    'inference_batch_size',
+    'Number of requests merged into one forward pass',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+queue_wait_histogram = Histogram(
+    'inference_queue_wait_seconds',
+    'Time a request waits in the batching queue before its forward pass',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent /predict requests into padded batches.
+
+    Requests are queued by `submit`; a single background task pulls up to
+    `max_batch_size` of them (waiting at most `max_wait_ms` after the first
+    one arrives), runs `predict_fn` once on the whole batch on `executor`
+    and resolves each caller's future with its own result.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[str]], List[Any]],
+        max_batch_size: int = config.BATCH_MAX_SIZE,
+        max_wait_ms: float = config.BATCH_MAX_WAIT_MS,
+        executor: Optional[Executor] = None,
+    ):
+        """
+        Args:
+            predict_fn (Callable): Runs one forward pass over a list of texts and
+                returns one result per text, in order.
+            max_batch_size (int): Upper bound on texts per forward pass.
+            max_wait_ms (float): How long to wait for more requests after the first.
+            executor (Executor): Where `predict_fn` runs (None: asyncio's default executor).
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self._queue = None
+        self._worker = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests waiting for a forward pass (not counting the batch being run)."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        """Starts the batching task on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the batching task and fails any request still queued."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+        batch_queue_depth_gauge.set(0)
+
+    async def submit(self, text: str) -> Any:
+        """Queues one text and waits for its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future, perf_counter()))
+        batch_queue_depth_gauge.set(self._queue.qsize())
+        return await future
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        batch_queue_depth_gauge.set(self._queue.qsize())
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+
+            # Callers that went away (client disconnect) are dropped before the forward pass
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+
+            now = perf_counter()
+            for _, _, enqueued_at in batch:
+                queue_wait_histogram.observe(now - enqueued_at)
+            batch_size_histogram.observe(len(batch))
+
+            texts = [text for text, _, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.predict_fn, texts)
+            except Exception as e:
+                logging.error(f"Batched prediction failed: {e}", exc_info=True)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
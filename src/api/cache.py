@@ -0,0 +1,96 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Optional
+
+from prometheus_client import Counter, Gauge
+
+import config
+from src.serving.text import clean_text
+
+cache_hits = Counter('prediction_cache_hits_total', 'Predictions served from the cache')
+cache_misses = Counter('prediction_cache_misses_total', 'Predictions that missed the cache')
+cache_evictions = Counter(
+    'prediction_cache_evictions_total',
+    'Cache entries dropped because the cache was full or the entry expired',
+)
+cache_size = Gauge(
+    'prediction_cache_size', 'Number of entries in the prediction cache', multiprocess_mode='livesum'
+)
+
+
+class PredictionCache:
+    """
+    Bounded in-process LRU cache of predictions with a per-entry TTL.
+
+    Keys are the hash of the `clean_text`-normalized input plus the model
+    version, and the whole cache is dropped when the model version changes.
+    """
+
+    def __init__(
+        self,
+        max_size: int = config.PREDICTION_CACHE_SIZE,
+        ttl_seconds: float = config.PREDICTION_CACHE_TTL_SECONDS,
+    ):
+        """
+        Args:
+            max_size (int): Maximum number of entries. 0 disables the cache.
+            ttl_seconds (float): Lifetime of an entry.
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.model_version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def set_model_version(self, model_version: str) -> None:
+        """Binds the cache to a model version, clearing it if the version changed."""
+        if model_version == self.model_version:
+            return
+        with self._lock:
+            if model_version != self.model_version:
+                self._entries.clear()
+                cache_size.set(0)
+                self.model_version = model_version
+
+    def key(self, text: str) -> str:
+        normalized = clean_text(text).strip()
+        return hashlib.sha256(f"{self.model_version}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < monotonic():
+                del self._entries[key]
+                cache_evictions.inc()
+                cache_size.set(len(self._entries))
+                entry = None
+            if entry is None:
+                cache_misses.inc()
+                return None
+            self._entries.move_to_end(key)
+        cache_hits.inc()
+        return entry[1]
+
+    def put(self, key: str, value: dict) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                cache_evictions.inc()
+            cache_size.set(len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            cache_size.set(0)
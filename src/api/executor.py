@@ -0,0 +1,62 @@
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from prometheus_client import Gauge
+
+import config
+
+executor_queue_depth = Gauge(
+    'inference_executor_queue_depth',
+    'Inference tasks submitted to the executor and not finished (running + waiting)',
+    multiprocess_mode='livesum',
+)
+
+
+class InferenceExecutor(ThreadPoolExecutor):
+    """
+    Thread pool reserved for model work (tokenization and forward passes).
+
+    Keeping it apart from asyncio's default executor means a burst of
+    inference can't starve `registry.load`, /health or /metrics of threads,
+    and the forward passes themselves never run on the event loop. torch and
+    ONNX Runtime release the GIL while computing, so the loop keeps answering
+    while a batch runs; a process pool would add pickling on every call and
+    a copy of the model per process instead.
+
+    `queue_depth` counts tasks submitted and not finished (running + waiting).
+    """
+
+    def __init__(self, max_workers: int = config.INFERENCE_EXECUTOR_WORKERS):
+        """
+        Args:
+            max_workers (int): Forward passes allowed to run at the same time.
+        """
+        super().__init__(max_workers=max_workers, thread_name_prefix="inference")
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._pending
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        with self._pending_lock:
+            self._pending += 1
+        executor_queue_depth.inc()
+        try:
+            future = super().submit(fn, *args, **kwargs)
+        except BaseException:
+            self._task_done(None)
+            raise
+        future.add_done_callback(self._task_done)
+        return future
+
+    def _task_done(self, future) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+        executor_queue_depth.dec()
+
+
+inference_executor = InferenceExecutor()
+
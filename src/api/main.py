@@ -1,20 +1,31 @@
+import asyncio
+import json
+import os
 from fastapi import FastAPI, HTTPException, Request, Body
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-import numpy as np
 from fastapi import Response
-from prometheus_client import Counter, generate_latest, CONTENT_TYPE_LATEST
-from src.model.trainer import ModelTrainer
+from prometheus_client import CollectorRegistry, Counter, REGISTRY, generate_latest, multiprocess, CONTENT_TYPE_LATEST
+import config
+from src.api.admission import AdmissionController, AdmissionMiddleware
+from src.api.batching import MicroBatcher
+from src.api.cache import PredictionCache
+from src.api.executor import inference_executor
+from src.api.memory import read_memory, update_memory_gauges
+from src.api.metrics import stage_timer
+from src.api.registry import ModelLoadError, registry
 import logging
 from prometheus_fastapi_instrumentator import Instrumentator
 from time import time
-from typing import Dict, Any
+from typing import Dict, Any, List
 from typing import Literal, Optional
 from datetime import datetime
 
 
 # Initialize FastAPI app with metadata
 app = FastAPI(title="ML Model Serving API")
-Instrumentator().instrument(app).expose(app)
+# Request metrics only: /metrics is served below (aggregated across pre-forked workers)
+Instrumentator().instrument(app)
 
 # Prometheus metrics counter
 prediction_counter = Counter('model_predictions_total',
@@ -25,11 +36,57 @@ error_counter = Counter(
     'Total API errors',
 )
 
-model_load_error = Counter('model_load_errors_total', 'Total model loading failures')
+def predict_batch(texts: List[str]) -> List[dict]:
+    """
+    Runs one padded forward pass over `texts` with the resident engine
+    and returns the prediction of each text, in order.
+    Each stage is timed in `inference_stage_seconds`.
+    """
+    engine = registry.get()
+    version, size = registry.model_version, len(texts)
+    with stage_timer("clean", version, size):
+        cleaned = engine.clean(texts)
+    with stage_timer("tokenize", version, size):
+        encoding = engine.tokenize(cleaned)
+    with stage_timer("forward", version, size):
+        probabilities = engine.predict_proba_encoded(encoding["input_ids"], encoding["attention_mask"])
+    with stage_timer("postprocess", version, size):
+        return [engine.format_prediction(probs) for probs in probabilities]
+
+batcher = MicroBatcher(predict_batch, executor=inference_executor)
+
+# Over budget, prediction requests get 429 + Retry-After and /health reports not ready
+admission = AdmissionController(queue_depth=lambda: batcher.queue_depth)
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=admission,
+    endpoints={"/predict": "predict", "/predict/batch": "predict_batch"},
+)
+prediction_cache = PredictionCache()
+
+def _retrieve_load_error(future: asyncio.Future) -> None:
+    """
+    Marks a failed background load's exception as retrieved. The registry has
+    already logged it and /health reports it; without this, asyncio also logs
+    "Future exception was never retrieved" since nothing awaits the future.
+    """
+    if not future.cancelled():
+        future.exception()
+
+@app.on_event("startup")
+async def load_model():
+    """
+    Loads the model into the registry once per process and starts the batcher.
+    Loading runs in a worker thread so /health can answer (not ready) meanwhile.
+    """
+    loop = asyncio.get_running_loop()
+    app.state.model_loading = loop.run_in_executor(None, registry.load)
+    app.state.model_loading.add_done_callback(_retrieve_load_error)
+    batcher.start()
 
-class ModelLoadError(Exception):
-    """Custom exception for model loading failures"""
-    pass
+@app.on_event("shutdown")
+async def stop_batcher():
+    await batcher.stop()
 
 # Input Model
 class PredictionRequest(BaseModel):
@@ -60,14 +117,51 @@ class PredictionResponse(BaseModel):
     status: Literal["success", "error"]
     error_details: Optional[str] = None
 
+class BatchPredictionRequest(BaseModel):
+    """
+    Request body for /predict/batch: a list of texts to score
+    """
+    texts: List[str]
+
 @app.get("/health")
 async def health_check():
     """
     Health check endpoint for Kubernetes
-    Returns 200 if the service is healthy
-    Used by K8s liveness and readiness probes
+    Returns 200 once the model is loaded, 503 while it is still loading
+    or while the pod is saturated (all workers' admission budget in use,
+    until it drains back to READINESS_RECOVERY_RATIO of it)
+    Used by K8s readiness probe
     """
-    return {"status": "healthy"}
+    if not registry.is_ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "error" if registry.load_error else "loading",
+                     "error_details": registry.load_error},
+        )
+    if admission.pod_saturated():
+        return JSONResponse(
+            status_code=503,
+            content={"status": "saturated",
+                     "error_details": f"{admission.pod_in_flight} requests in flight in this pod"},
+        )
+    return {"status": "healthy", "model_version": registry.model_version}
+
+@app.get("/live")
+async def liveness_check():
+    """
+    Liveness endpoint for Kubernetes
+    Returns 200 as long as the process is serving requests
+    """
+    return {"status": "alive"}
+
+@app.get("/memory")
+async def memory_usage():
+    """
+    Memory of the worker that answers, in bytes: RSS, PSS, shared and private.
+    Under the pre-fork server (src.api.prefork) the model weights show up as
+    shared pages, counted once across all workers in PSS.
+    """
+    return {"pid": os.getpid(), **read_memory()}
 
 @app.get("/metrics")
 async def metrics():
@@ -77,9 +171,16 @@ async def metrics():
     - Total prediction count
     - Response times
     - Error rates
+    Under the pre-fork server (PROMETHEUS_MULTIPROC_DIR set) the values of
+    all workers are aggregated, whichever worker answers the scrape.
     """
+    update_memory_gauges()
+    metrics_registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        metrics_registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(metrics_registry)
     return Response(
-        generate_latest().decode('utf-8'),
+        generate_latest(metrics_registry).decode('utf-8'),
         media_type=CONTENT_TYPE_LATEST
     )
 
@@ -87,12 +188,17 @@ async def metrics():
 async def predict(request: PredictionRequest):
     start_time = time()
     try:
-        logging.info("Loading model...")
-        model = ModelTrainer.load_model()
-        logging.info("Model loaded successfully.")
+        registry.get()
 
-        prediction = model.predict([request.text])
-        logging.info(f"Prediction made: {prediction}")
+        # Repeated texts are answered from the cache (dropped when the model changes)
+        prediction_cache.set_model_version(registry.model_id)
+        cache_key = prediction_cache.key(request.text)
+        result = prediction_cache.get(cache_key)
+        if result is None:
+            # Merged with concurrent requests into a single forward pass
+            result = await batcher.submit(request.text)
+            prediction_cache.put(cache_key, result)
+        logging.info(f"Prediction made: {result['prediction']}")
 
         # Increment prediction counter with "none" as no error occurred
         logging.info("Incrementing prediction_counter with error_type=none")
@@ -100,26 +206,17 @@ async def predict(request: PredictionRequest):
 
         response_data = {
             "text": request.text,
-            "prediction": int(prediction[0]),
-            "prediction_label": "positive" if prediction[0] == 1 else "negative",
-            "model_version": "1.0.0",
+            **result,
+            "model_version": registry.model_version,
             "model_type": "SentimentAnalysis",
             "timestamp": datetime.utcnow().isoformat(),
             "status": "success",
             "processing_time_ms": (time() - start_time) * 1000
         }
 
-        if hasattr(model, "predict_proba"):
-            probabilities = model.predict_proba([request.text])[0]
-            response_data.update({
-                "confidence": float(np.max(probabilities)),
-                "probabilities": {
-                    "negative": float(probabilities[0]),
-                    "positive": float(probabilities[1])
-                }
-            })
-
-        return response_data
+        with stage_timer("serialize", registry.model_version):
+            body = PredictionResponse(**response_data).model_dump_json()
+        return Response(body, media_type="application/json")
 
     except ValueError as e:
         logging.info("Incrementing prediction_counter with error_type=none")
@@ -165,6 +262,100 @@ async def predict(request: PredictionRequest):
             }
         )
 
+@app.post("/predict/batch")
+async def predict_bulk(request: BatchPredictionRequest):
+    """
+    Bulk prediction endpoint.
+    Tokenizes all texts in one call, then runs chunked forward passes and streams
+    one NDJSON line per text (in input order) as soon as its chunk is scored.
+    """
+    start_time = time()
+    if len(request.texts) > config.BULK_MAX_TEXTS:
+        error_counter.inc()
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "status": "error",
+                "error_details": f"At most {config.BULK_MAX_TEXTS} texts per request.",
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+        )
+    try:
+        engine = registry.get()
+    except ModelLoadError as e:
+        error_counter.inc()
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "status": "error",
+                "error_details": str(e),
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+        )
+
+    def encode(texts: List[str]):
+        version, size = registry.model_version, len(texts)
+        with stage_timer("clean", version, size):
+            cleaned = engine.clean(texts)
+        with stage_timer("tokenize", version, size):
+            return engine.tokenize(cleaned)
+
+    def score_chunk(input_ids, attention_mask):
+        with stage_timer("forward", registry.model_version, len(input_ids)):
+            return engine.predict_proba_encoded(input_ids, attention_mask)
+
+    async def stream_predictions():
+        if not request.texts:
+            return
+        loop = asyncio.get_running_loop()
+        encoding = await loop.run_in_executor(inference_executor, encode, request.texts)
+        # torch tensors or numpy arrays, depending on the inference backend
+        lengths = encoding["attention_mask"].sum(1)
+
+        for start in range(0, len(request.texts), config.BULK_CHUNK_SIZE):
+            end = start + config.BULK_CHUNK_SIZE
+            # Trim each chunk to its own longest sequence
+            width = int(lengths[start:end].max())
+            try:
+                probabilities = await loop.run_in_executor(
+                    inference_executor,
+                    score_chunk,
+                    encoding["input_ids"][start:end, :width],
+                    encoding["attention_mask"][start:end, :width],
+                )
+            except Exception as e:
+                logging.error(f"Error in predict_bulk: {e}", exc_info=True)
+                error_counter.inc()
+                yield json.dumps({
+                    "index": start,
+                    "status": "error",
+                    "error_details": "Internal server error",
+                    "timestamp": datetime.utcnow().isoformat(),
+                }) + "\n"
+                return
+
+            prediction_counter.inc(len(probabilities))
+            version, size = registry.model_version, len(probabilities)
+            with stage_timer("postprocess", version, size):
+                predictions = [engine.format_prediction(probs) for probs in probabilities]
+            timestamp = datetime.utcnow().isoformat()
+            with stage_timer("serialize", version, size):
+                lines = []
+                for offset, prediction in enumerate(predictions):
+                    lines.append(json.dumps({
+                        "index": start + offset,
+                        "text": request.texts[start + offset],
+                        **prediction,
+                        "model_version": version,
+                        "model_type": "SentimentAnalysis",
+                        "processing_time_ms": (time() - start_time) * 1000,
+                        "timestamp": timestamp,
+                        "status": "success",
+                    }))
+            yield "\n".join(lines) + "\n"
+
+    return StreamingResponse(stream_predictions(), media_type="application/x-ndjson")
+
 # Debug endpoint (optional)
 @app.post("/predict_debug")
 async def predict_debug(request: Request):
@@ -0,0 +1,64 @@
+import os
+
+from typing import Dict, List
+
+from prometheus_client import Gauge
+
+MEMORY_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def read_memory(pid="self") -> Dict[str, int]:
+    """
+    Memory of a process in bytes, from /proc/<pid>/smaps_rollup (Linux):
+    `rss`, `pss` (RSS with shared pages split between their users, i.e. what the
+    process really costs), `shared` and `private` pages.
+    """
+    values = dict.fromkeys(MEMORY_FIELDS, 0)
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in values:
+                values[key] = int(rest.split()[0]) * 1024  # kB
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "shared": values["Shared_Clean"] + values["Shared_Dirty"],
+        "private": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+memory_gauges = {
+    kind: Gauge(
+        f"worker_memory_{kind}_bytes",
+        f"{kind.upper()} memory of a serving worker (as of its last /metrics scrape)",
+        multiprocess_mode="liveall",
+    )
+    for kind in ("rss", "pss", "shared", "private")
+}
+
+
+def update_memory_gauges() -> None:
+    """Sets the worker_memory_* gauges to this process's current memory (no-op without /proc)."""
+    try:
+        memory = read_memory()
+    except OSError:
+        return
+    for kind, gauge in memory_gauges.items():
+        gauge.set(memory[kind])
+
+
+def format_memory_report(pids: List[int]) -> str:
+    """One line per process with RSS / PSS / shared / private in MiB, plus the PSS total."""
+    lines, total_pss = [], 0
+    for pid in pids:
+        try:
+            memory = read_memory(pid)
+        except OSError:
+            continue
+        total_pss += memory["pss"]
+        lines.append(
+            f"  pid {pid}: "
+            + ", ".join(f"{kind} {value / 2**20:.0f} MiB" for kind, value in memory.items())
+        )
+    lines.append(f"  total PSS: {total_pss / 2**20:.0f} MiB")
+    return "\n".join(lines)
@@ -0,0 +1,48 @@
+from contextlib import contextmanager
+from time import perf_counter
+
+from prometheus_client import Gauge, Histogram
+
+STAGES = ("clean", "tokenize", "forward", "postprocess", "serialize")
+
+stage_latency_histogram = Histogram(
+    'inference_stage_seconds',
+    'Time spent in one stage of the serving path (clean, tokenize, forward, postprocess, serialize)',
+    ['stage', 'model_version', 'batch_size'],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+in_flight_gauge = Gauge(
+    'inference_requests_in_flight',
+    'Prediction requests (/predict, /predict/batch) accepted and not yet answered',
+    multiprocess_mode='livesum',
+)
+
+batch_queue_depth_gauge = Gauge(
+    'inference_batch_queue_depth',
+    'Requests waiting in the micro-batching queue for a forward pass',
+    multiprocess_mode='livesum',
+)
+
+
+def batch_size_label(batch_size: int) -> str:
+    """
+    Buckets a batch size into a power of two ("1", "2", "4", ... "64+") so the
+    label has a handful of values instead of one per size.
+    """
+    bucket = 1
+    while bucket < batch_size and bucket < 64:
+        bucket *= 2
+    return "64+" if batch_size > 64 else str(bucket)
+
+
+@contextmanager
+def stage_timer(stage: str, model_version: str, batch_size: int = 1):
+    """Observes the duration of the `with` block in `inference_stage_seconds`."""
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        stage_latency_histogram.labels(
+            stage=stage, model_version=model_version, batch_size=batch_size_label(batch_size)
+        ).observe(perf_counter() - start)
@@ -0,0 +1,149 @@
+import gc
+import os
+import glob
+import time
+import signal
+import socket
+import logging
+import argparse
+import tempfile
+
+import config
+from src.serving.threads import configure_torch_threads
+
+
+def _run_worker(app, sock: socket.socket, workers: int) -> None:
+    """Child process: serves the (already loaded) app on the shared socket."""
+    import uvicorn
+
+    from src.api.memory import update_memory_gauges
+
+    # Share the container's cores between workers instead of each one using all of them
+    configure_torch_threads(workers)
+    update_memory_gauges()
+
+    server = uvicorn.Server(uvicorn.Config(app, log_level=config.LOG_LEVEL.lower()))
+    server.run(sockets=[sock])
+
+
+def serve(
+    workers: int = config.MAX_WORKERS,
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    report_interval: float = config.MEMORY_REPORT_INTERVAL_SECONDS,
+) -> None:
+    """
+    Pre-fork server: loads the model once in this (parent) process, then forks
+    `workers` uvicorn workers that accept on one shared socket.
+
+    The children inherit the weights copy-on-write and only ever read them, so
+    the pages stay shared: N workers cost roughly one model plus N small heaps
+    instead of N models. `gc.freeze()` keeps the garbage collector from
+    touching (and so copying) the objects that exist at fork time.
+
+    The parent restarts workers that die, forwards SIGTERM/SIGINT to them and
+    logs each worker's RSS / PSS / shared / private memory every
+    `report_interval` seconds.
+
+    Metrics run in prometheus_client's multiprocess mode: every worker writes
+    its values under PROMETHEUS_MULTIPROC_DIR and /metrics aggregates all of
+    them, so counters don't jump between workers from one scrape to the next.
+    /memory stays per worker.
+    """
+    logging.basicConfig(level=config.LOG_LEVEL)
+
+    # Must be set before prometheus_client is first imported (it picks its value class then)
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or tempfile.mkdtemp(
+        prefix="prometheus_multiproc_"
+    )
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = multiproc_dir
+    os.makedirs(multiproc_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(multiproc_dir, "*.db")):
+        os.remove(stale)
+
+    from prometheus_client import multiprocess
+    from src.api.main import admission, app
+    from src.api.memory import format_memory_report, update_memory_gauges
+    from src.api.registry import registry
+
+    # Bound before the (possibly slow) load: a busy port fails at once, and
+    # connections made meanwhile wait in the backlog instead of being refused.
+    # Nothing answers until the workers start: k8s/deployment.yaml's
+    # startupProbe covers that window so the livenessProbe can't kill the pod.
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    registry.load()
+    # The pod's readiness budget is shared by all workers
+    admission.workers = workers
+
+    # Everything allocated so far (model included) is moved out of the GC's reach
+    gc.collect()
+    gc.freeze()
+
+    children = set()
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                _run_worker(app, sock, workers)
+            except BaseException:
+                logging.exception(f"Worker {os.getpid()} failed")
+                code = 1
+            finally:
+                os._exit(code)
+        children.add(pid)
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        spawn()
+    logging.info(f"Serving on {host}:{port} with {workers} pre-forked workers {sorted(children)}")
+
+    next_report = time.monotonic() + min(report_interval, 10)
+    while children:
+        pid, status = os.waitpid(-1, os.WNOHANG)
+        if pid:
+            children.discard(pid)
+            # Drops the dead worker's live gauges (in-flight, queue depths...) from /metrics
+            multiprocess.mark_process_dead(pid)
+            if not stopping:
+                logging.warning(f"Worker {pid} exited (status {status}), starting a new one")
+                time.sleep(1)
+                spawn()
+            continue
+        if time.monotonic() >= next_report and not stopping:
+            logging.info("Worker memory:\n" + format_memory_report(sorted(children)))
+            update_memory_gauges()
+            next_report = time.monotonic() + report_interval
+        time.sleep(0.5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API with pre-forked workers sharing one model.")
+    parser.add_argument("--workers", type=int, default=config.MAX_WORKERS)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--report-interval", type=float, default=config.MEMORY_REPORT_INTERVAL_SECONDS)
+    args = parser.parse_args()
+
+    serve(args.workers, args.host, args.port, args.report_interval)
+
+
+if __name__ == "__main__":
+    main()
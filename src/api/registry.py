@@ -0,0 +1,127 @@
+import os
+import logging
+import threading
+import time
+
+from prometheus_client import Counter
+
+import config
+from src.serving.engine import BaseInferenceEngine
+from src.serving.threads import configure_torch_threads, inference_threads
+
+model_load_error = Counter('model_load_errors_total', 'Total model loading failures')
+
+
+class ModelLoadError(Exception):
+    """Custom exception for model loading failures"""
+    pass
+
+
+class ModelRegistry:
+    """
+    Process-wide holder for the serving model.
+
+    The classifier, its tokenizer and the label map are loaded once (at app
+    startup) and then shared by every request handled by this process.
+    """
+
+    def __init__(
+        self,
+        model_path: str = None,
+        quantized: bool = config.SERVE_QUANTIZED,
+        backend: str = config.INFERENCE_BACKEND,
+    ):
+        if backend not in ("torch", "onnx"):
+            raise ValueError(f"Unknown inference backend {backend!r} (expected 'torch' or 'onnx').")
+        self.backend = backend
+        self.quantized = quantized and backend == "torch"
+        if model_path is None:
+            if backend == "onnx":
+                model_path = os.path.join(config.ONNX_EXPORT_DIR, "model.onnx")
+            elif self.quantized:
+                model_path = config.QUANTIZED_MODEL_PATH
+            elif os.path.isfile(os.path.join(config.SERVING_MODEL_DIR, "model.safetensors")):
+                # Offline bundle: fast cold start, no Hub access
+                model_path = config.SERVING_MODEL_DIR
+            else:
+                model_path = config.BEST_MODEL_PATH
+        self.model_path = model_path
+        self.model_version = config.MODEL_VERSION
+        self.engine = None
+        self.model_id = None
+        self.load_error = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def load(self) -> None:
+        """
+        Loads the model, tokenizer and label map. Safe to call more than once:
+        only the first successful call does any work.
+        """
+        with self._lock:
+            if self.is_ready:
+                return
+            try:
+                logging.info("Loading model...")
+                self.engine = self._build_engine()
+                variant = "onnx" if self.backend == "onnx" else "int8" if self.quantized else "fp32"
+                self.model_id = f"{self.model_version}:{variant}:{self._checkpoint_fingerprint()}"
+                self.load_error = None
+                self._ready.set()
+                logging.info("Model loaded successfully.")
+            except Exception as e:
+                logging.error(f"Model loading failed: {e}", exc_info=True)
+                model_load_error.inc()
+                self.load_error = str(e)
+                raise ModelLoadError(str(e)) from e
+
+    def _build_engine(self) -> BaseInferenceEngine:
+        # Backends are imported on demand: the ONNX one must not pull in torch
+        if self.backend == "onnx":
+            from src.serving.onnx_engine import OnnxInferenceEngine
+
+            return OnnxInferenceEngine.from_export(
+                os.path.dirname(self.model_path), num_threads=inference_threads()
+            )
+
+        from src.serving.torch_engine import InferenceEngine
+
+        # Before the first forward pass: inter-op threads can't change afterwards
+        configure_torch_threads()
+        engine = InferenceEngine.from_checkpoint(
+            self.model_path, config.DEVICE, quantized=self.quantized
+        )
+        if engine.compiled_forward is not None:
+            # Before the registry is ready: live requests never wait for a compile
+            start = time.perf_counter()
+            n_buckets = engine.compiled_forward.warmup(config.COMPILE_WARMUP_BATCH_SIZES, engine.device)
+            logging.info(f"Compiled {n_buckets} buckets in {time.perf_counter() - start:.1f}s")
+        return engine
+
+    def _checkpoint_fingerprint(self) -> str:
+        """Identifies the loaded weights so caches can tell when they change."""
+        path = self.model_path
+        if os.path.isdir(path):
+            path = os.path.join(path, "model.safetensors")
+        if not os.path.exists(path):
+            return "hub"
+        stat = os.stat(path)
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+    def get(self) -> BaseInferenceEngine:
+        """
+        Returns the resident inference engine (model, tokenizer and label map).
+
+        Raises:
+            ModelLoadError: If the model has not finished loading.
+        """
+        if not self.is_ready:
+            raise ModelLoadError(self.load_error or "Model is still loading")
+        return self.engine
+
+
+registry = ModelRegistry()
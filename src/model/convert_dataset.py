@@ -0,0 +1,70 @@
+import os
+import argparse
+import pandas as pd
+
+import config
+from config import LABEL_MAPPING
+from src.model.data_extraction import DATA_COLUMNS, iter_file_chunks
+
+
+def convert_to_parquet(
+    input_path: str = config.DATASET_PATH,
+    output_dir: str = config.PARQUET_DATASET_PATH,
+    rows_per_file: int = 1_000_000,
+) -> int:
+    """
+    Converts a CSV/TXT/JSONL dataset into a partitioned Parquet folder
+    (`part-00000.parquet`, `part-00001.parquet`, ...) holding only the
+    `text` and `label` columns, in the original row order.
+
+    The input is streamed, so this works on files larger than memory.
+
+    Returns:
+        int: Number of rows written.
+
+    Raises:
+        ValueError: If a score is not one of `LABEL_MAPPING`'s keys (missing
+            scores are kept as NA; `prepare_dataframe` drops those rows).
+    """
+    if os.path.exists(output_dir) and os.listdir(output_dir):
+        raise ValueError(f"Output folder {output_dir} is not empty.")
+    os.makedirs(output_dir, exist_ok=True)
+
+    n_rows = 0
+    for part, chunk in enumerate(iter_file_chunks(input_path, DATA_COLUMNS, rows_per_file)):
+        chunk = chunk.reset_index(drop=True)
+        chunk["text"] = chunk["text"].astype("string")
+        # Scores are small integers; keep NaN-able values as a nullable int8
+        labels = pd.to_numeric(chunk["label"], errors="coerce")
+        invalid = chunk["label"].notna() & ~labels.isin(LABEL_MAPPING.keys())
+        if invalid.any():
+            raise ValueError(
+                f"Dataset contains invalid score values {chunk['label'][invalid].unique()[:5].tolist()}. "
+                f"Allowed values: {sorted(LABEL_MAPPING.keys())}"
+            )
+        chunk["label"] = labels.astype("Int8")
+        chunk.to_parquet(
+            os.path.join(output_dir, f"part-{part:05d}.parquet"),
+            engine="pyarrow",
+            compression="zstd",
+            index=False,
+        )
+        n_rows += len(chunk)
+        print(f"🧱 Wrote part {part} ({n_rows} rows so far)")
+
+    print(f"✅ Converted {input_path} -> {output_dir} ({n_rows} rows)")
+    return n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the raw dataset to partitioned Parquet.")
+    parser.add_argument("--input-path", default=config.DATASET_PATH)
+    parser.add_argument("--output-dir", default=config.PARQUET_DATASET_PATH)
+    parser.add_argument("--rows-per-file", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    convert_to_parquet(args.input_path, args.output_dir, args.rows_per_file)
+
+
+if __name__ == "__main__":
+    main()
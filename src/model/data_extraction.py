@@ -1,27 +1,82 @@
+import os
 import pandas as pd
 import json 
 
-from config import SENTIMENT_MAPPING, SENTIMENT_MAPPING_3_LABEL_VERSION, LABEL_MAPPING
+from config import LABEL_MAPPING, READ_CHUNK_ROWS
+from src.serving.engine import get_label_mapping
 
-def load_file_by_type(file_path):
+DATA_COLUMNS = ["text", "label"]
 
+
+def _keep_columns(df, columns):
+    return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+
+def load_file_by_type(file_path, columns=None):
+    """
+    Loads a dataset file into a DataFrame. When `columns` is given, columnar
+    formats (Parquet, Arrow) and CSV only parse those columns, and JSONL is
+    streamed so unused fields never pile up in memory.
+    """
     try:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(file_path)
         if file_path.endswith(".csv") or file_path.endswith(".txt"):
-            return pd.read_csv(file_path)  # Load csv file
+            usecols = None if columns is None else (lambda column: column in columns)
+            return pd.read_csv(file_path, usecols=usecols)  # Load csv file
+        elif file_path.endswith(".parquet"):
+            return pd.read_parquet(file_path, columns=columns)  # File or partitioned folder
+        elif file_path.endswith(".arrow") or file_path.endswith(".feather"):
+            return pd.read_feather(file_path, columns=columns)  # Arrow IPC file
+        elif file_path.endswith(".jsonl"):
+            return pd.concat(list(iter_file_chunks(file_path, columns=columns)), ignore_index=True)
         elif file_path.endswith(".json"):
             with open(file_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
-            return pd.DataFrame(data)  # Convert json to dataframe
+            return _keep_columns(pd.DataFrame(data), columns)  # Convert json to dataframe
         elif file_path.endswith(".xlsx"):
-            return pd.read_excel(file_path, engine="openpyxl")  # Load Excel file
+            return _keep_columns(pd.read_excel(file_path, engine="openpyxl"), columns)  # Load Excel file
         else:
             raise ValueError(
-                f"Unsupported file format : {file_path}. Only CSV, TXT, JSON, and XLSX are supported."
+                f"Unsupported file format : {file_path}. "
+                "Only CSV, TXT, JSON, JSONL, XLSX, Parquet and Arrow are supported."
             )
     except FileNotFoundError:
         raise FileNotFoundError(f"Error: File {file_path} not found.")
 
 
+def iter_file_chunks(file_path, columns=None, chunksize=READ_CHUNK_ROWS):
+    """
+    Streams a CSV/TXT, JSONL, Parquet or Arrow file as raw DataFrame chunks of
+    at most `chunksize` rows, reading only `columns` when given.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Error: File {file_path} not found.")
+
+    if file_path.endswith(".csv") or file_path.endswith(".txt"):
+        usecols = None if columns is None else (lambda column: column in columns)
+        with pd.read_csv(file_path, usecols=usecols, chunksize=chunksize) as reader:
+            yield from reader
+    elif file_path.endswith(".jsonl"):
+        with pd.read_json(file_path, lines=True, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield _keep_columns(chunk, columns)
+    elif file_path.endswith(".parquet") or file_path.endswith(".arrow") or file_path.endswith(".feather"):
+        import pyarrow.dataset as ds
+
+        file_format = "parquet" if file_path.endswith(".parquet") else "ipc"
+        dataset = ds.dataset(file_path, format=file_format)
+        if columns is not None:
+            columns = [c for c in columns if c in dataset.schema.names]
+        for batch in dataset.to_batches(columns=columns, batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(
+            f"Unsupported file format for streaming : {file_path}. "
+            "Only CSV, TXT, JSONL, Parquet and Arrow are supported."
+        )
+
+
 def merge_score_labels(score): 
 
   if score <= 1: 
@@ -32,35 +87,50 @@ def merge_score_labels(score):
     return 2 # positive
 
 
-def load_data(file_path, merge_labels):
+def prepare_dataframe(df, merge_labels):
+    """
+    Validates the `text`/`label` columns and adds `label_id`/`label_text`.
+    Shared by load_data and the training scripts (which read rows through
+    `DatasetIndex`) so every sample gets exactly the same treatment as the
+    full file.
+    """
+    # Check if required columns exist
+    required_columns = {"text", "label"}
+    if not required_columns.issubset(df.columns):
+        raise ValueError("Dataset must contain 'text' and 'label' columns.")
 
-    try:
-        df = load_file_by_type(file_path)
+    # Keep only relevant columns
+    df = df[["text", "label"]].dropna()
 
-        # Check if required columns exist
-        required_columns = {"text", "label"}
-        if not required_columns.issubset(df.columns):
-            raise ValueError("Dataset must contain 'text' and 'label' columns.")
+    # ✅ Convert `score` values using `LABEL_MAPPING` (1-5 → 0-4)
+    if not df["label"].isin(LABEL_MAPPING.keys()).all():
+        raise ValueError(
+            f"Dataset contains invalid score values. Allowed values: {sorted(LABEL_MAPPING.keys())}"
+        )
 
-        # Keep only relevant columns
-        df = df[["text", "label"]].dropna()
+    df["label_id"] = df["label"].map(LABEL_MAPPING).astype(int)
 
-        # ✅ Convert `score` values using `LABEL_MAPPING` (1-5 → 0-4)
-        if not df["label"].isin(LABEL_MAPPING.keys()).all():
-            raise ValueError(
-                f"Dataset contains invalid score values. Allowed values: {sorted(LABEL_MAPPING.keys())}"
-            )
+    if merge_labels:
+     df["label_id"] = df["label_id"].apply(merge_score_labels)
+    # label_id -> name, the same mapping the model is evaluated and served with
+    sentiment_mapper = get_label_mapping(merge_labels)
 
-        df["label_id"] = df["label"].map(LABEL_MAPPING).astype(int)
+    # A handful of distinct labels: small ints and a categorical with fixed
+    # categories (so chunks concatenate without falling back to object dtype)
+    df["label_id"] = df["label_id"].astype("int8")
+    df["label_text"] = df["label_id"].map(sentiment_mapper).astype(
+        pd.CategoricalDtype(list(dict.fromkeys(sentiment_mapper.values())))
+    )
 
-        if merge_labels:
-         df["label_id"] = df["label_id"].apply(merge_score_labels)
-         df["label_text"] = df["label_id"].map(SENTIMENT_MAPPING_3_LABEL_VERSION)
-        else:
-         df["label_text"] = df["label_id"].map(SENTIMENT_MAPPING)
-        
-        # Then only return the columns needed for training
-        return df[["text", "label_id", "label_text"]]
+    # Then only return the columns needed for training
+    return df[["text", "label_id", "label_text"]]
+
+
+def load_data(file_path, merge_labels):
+
+    try:
+        df = load_file_by_type(file_path, columns=DATA_COLUMNS)
+        return prepare_dataframe(df, merge_labels)
         # return df
 
     except FileNotFoundError as e:
@@ -5,45 +5,41 @@ from nltk.corpus import stopwords
 
 import config
 
-import re 
-import regex
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.model_selection import train_test_split
-from transformers import AutoTokenizer
 
-tokenizer = AutoTokenizer.from_pretrained(config.TOKENIZER_NAME)
+# Shared with serving (src.serving.text), which must not import this module's
+# training dependencies (pandas, nltk, sklearn).
+from src.serving.text import URL_PATTERN, NON_WORD_PATTERN, EMOJI_PATTERN, clean_text
 
-def clean_text(text):
-    text = text.lower()                                # lowercase
-    text = re.sub(r"http\S+|www\S+|https\S+", '', text) # remove URLs
-    text = re.sub(r"\W", " ", text)                     # remove punctuation
-    text = re.sub(r"\s+", " ", text)                    # remove extra spaces
-    text = regex.compile(r'\p{Emoji}').sub('', text)  # remove emoticones
-    # text = " ".join([word for word in text.split() if word not in stop_words])
-    return text
 
+def _clean_series(texts):
+  """Vectorized clean_text over a pandas Series of strings."""
+  texts = texts.str.lower()
+  texts = texts.str.replace(URL_PATTERN, '', regex=True)
+  texts = texts.str.replace(NON_WORD_PATTERN, " ", regex=True)
+  return texts.map(partial(EMOJI_PATTERN.sub, ''), na_action="ignore")
 
-def tokenize_texts(texts, max_length):
-  
-  tokenized = tokenizer(
-        texts, padding=True, truncation=True, max_length=max_length, return_tensors="pt"
-    )
 
-    # Convert PyTorch tensors to lists so they work with Pandas
-  return {
-     "input_ids": tokenized["input_ids"].tolist(),
-     "attention_mask": tokenized["attention_mask"].tolist(),
-   }
+def clean_texts(texts, n_jobs=config.CLEAN_TEXT_N_JOBS, chunk_size=100_000):
+  """
+  Cleans a whole Series of texts, giving exactly the same result as
+  `texts.apply(clean_text)`. With n_jobs > 1, chunks of `chunk_size` rows
+  are cleaned in parallel worker processes.
+  """
+  if n_jobs <= 1 or len(texts) <= chunk_size:
+    return _clean_series(texts)
 
-def preprocess_data(df, test_size, max_length):
-  # Ensure content column is cleaned
-    df["text"] = df["text"].apply(clean_text)
+  chunks = [texts.iloc[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+  with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+    return pd.concat(list(executor.map(_clean_series, chunks)))
 
-    # Tokenize the cleaned text
-    tokenized_data = tokenize_texts(df["text"].tolist(), max_length)
 
-    # Add tokenized columns back to the dataframe
-    df["input_ids"] = tokenized_data["input_ids"]
-    df["attention_mask"] = tokenized_data["attention_mask"]
+def preprocess_data(df, test_size):
+  # Ensure content column is cleaned
+    # (tokenization happens later, one batch at a time, in the DataLoader collate function)
+    df["text"] = clean_texts(df["text"])
 
     # Check if stratification is possible
     if df["label_id"].value_counts().min() < 2:
@@ -1,57 +1,239 @@
 import os
 import torch
+import numpy as np
 import pandas as pd
 
-from typing import Dict, Any
-from torch.utils.data import Dataset, DataLoader
+from typing import Dict, Any, Iterator, List
+from torch.utils.data import Dataset, DataLoader, Sampler, DistributedSampler
 from transformers import PreTrainedTokenizerBase
 
+import config
+from src.model.token_cache import TokenCache, load_or_build_token_cache
+
 class SentimentDataset(Dataset):
-    def __init__(self, reviews, labels, tokenizer, max_len=128):
+    """
+    Raw reviews and labels. Tokenization is done per batch by TokenizeCollator,
+    so one fast-tokenizer call covers the whole batch.
+    """
+
+    def __init__(self, reviews, labels):
         self.reviews = reviews
         self.labels = labels
-        self.tokenizer = tokenizer
-        self.max_len = max_len
 
     def __len__(self):
         return len(self.reviews)
 
     def __getitem__(self, idx):
-        review = str(self.reviews[idx])  
-        label = int(self.labels[idx])     
+        return {
+            "text": str(self.reviews[idx]),
+            "labels": int(self.labels[idx])
+        }
+
 
-        encoding = self.tokenizer.encode_plus(
-            review,
+class PreTokenizedDataset(Dataset):
+    """
+    Dataset reading token ids straight from a memory-mapped TokenCache:
+    no tokenizer call per sample or per epoch.
+    """
+
+    def __init__(self, token_cache: TokenCache, labels):
+        self.token_cache = token_cache
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.token_cache)
+
+    def __getitem__(self, idx):
+        input_ids = torch.from_numpy(self.token_cache[idx].astype(np.int64))
+
+        return {
+            "input_ids": input_ids,
+            "attention_mask": torch.ones_like(input_ids),
+            "labels": torch.tensor(int(self.labels[idx]), dtype=torch.long)
+        }
+
+
+class TokenizeCollator:
+    """
+    Collate function that tokenizes a whole batch of raw reviews in one
+    fast-tokenizer call, padding to the longest review in the batch.
+    """
+
+    def __init__(self, tokenizer: PreTrainedTokenizerBase, max_len: int, padding="longest"):
+        self.tokenizer = tokenizer
+        self.max_len = max_len
+        self.padding = padding
+
+    def __call__(self, batch: List[Dict[str, Any]]) -> Dict[str, torch.Tensor]:
+        encoding = self.tokenizer(
+            [item["text"] for item in batch],
             add_special_tokens=True,
             max_length=self.max_len,
-            return_token_type_ids=False,
-            padding="max_length",
+            padding=self.padding,
             truncation=True,
+            return_token_type_ids=False,
             return_attention_mask=True,
             return_tensors="pt"
         )
 
         return {
-            "input_ids": encoding["input_ids"].flatten(),
-            "attention_mask": encoding["attention_mask"].flatten(),
-            "labels": torch.tensor(label, dtype=torch.long)  
+            "input_ids": encoding["input_ids"],
+            "attention_mask": encoding["attention_mask"],
+            "labels": torch.tensor([item["labels"] for item in batch], dtype=torch.long)
         }
 
 
+class PadCollator:
+    """
+    Collate function that pads a batch only to its longest sequence
+    instead of to `max_len`.
+    """
 
-def create_dataloader(df, tokenizer, max_len, batch_size):
-    #Convert labels to tensor
-    labels = torch.tensor(df["label_id"].astype(int).to_numpy(), dtype=torch.long)
+    def __init__(self, pad_token_id: int = 0):
+        self.pad_token_id = pad_token_id
 
-    dataset = SentimentDataset(
-        reviews=df["text"].to_numpy(),
-        labels=labels,
-        tokenizer=tokenizer,
-        max_len=max_len,
-    )
+    def __call__(self, batch: List[Dict[str, torch.Tensor]]) -> Dict[str, torch.Tensor]:
+        width = max(item["input_ids"].size(0) for item in batch)
+        input_ids = torch.full((len(batch), width), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(batch), width), dtype=torch.long)
+
+        for row, item in enumerate(batch):
+            length = item["input_ids"].size(0)
+            input_ids[row, :length] = item["input_ids"]
+            attention_mask[row, :length] = item["attention_mask"]
+
+        return {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "labels": torch.stack([item["labels"] for item in batch]),
+        }
+
+
+class LengthBucketSampler(Sampler):
+    """
+    Batch sampler that groups samples of similar length to minimise padding.
+
+    Each epoch, indices are shuffled, split into pools of
+    `batch_size * bucket_size_multiplier` samples, sorted by length inside
+    each pool and cut into batches; the batch order is then shuffled again.
+
+    With `num_replicas > 1` (DistributedDataParallel), every rank builds the
+    same batch list from the shared seed and keeps every `num_replicas`-th
+    batch, wrapping around so all ranks run the same number of steps.
+    """
+
+    def __init__(
+        self,
+        lengths: np.ndarray,
+        batch_size: int,
+        bucket_size_multiplier: int = 50,
+        shuffle: bool = True,
+        seed: int = 42,
+        num_replicas: int = 1,
+        rank: int = 0,
+    ):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.pool_size = batch_size * bucket_size_multiplier
+        self.shuffle = shuffle
+        self.seed = seed
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.epoch = 0
+
+    def __len__(self) -> int:
+        n_batches = (len(self.lengths) + self.batch_size - 1) // self.batch_size
+        return (n_batches + self.num_replicas - 1) // self.num_replicas
+
+    def __iter__(self) -> Iterator[List[int]]:
+        rng = np.random.default_rng(self.seed + self.epoch)
+        self.epoch += 1
+
+        indices = rng.permutation(len(self.lengths)) if self.shuffle else np.arange(len(self.lengths))
+        batches = []
+        for start in range(0, len(indices), self.pool_size):
+            pool = indices[start : start + self.pool_size]
+            pool = pool[np.argsort(self.lengths[pool], kind="stable")]
+            batches.extend(
+                pool[i : i + self.batch_size].tolist()
+                for i in range(0, len(pool), self.batch_size)
+            )
+
+        if self.shuffle:
+            rng.shuffle(batches)
+        if self.num_replicas > 1:
+            n_total = len(self) * self.num_replicas
+            batches = (batches * (n_total // len(batches) + 1))[:n_total]
+            batches = batches[self.rank :: self.num_replicas]
+        return iter(batches)
+
+
+def create_dataloader(
+    df,
+    tokenizer,
+    max_len,
+    batch_size,
+    bucket_by_length=False,
+    token_cache_dir=None,
+    num_workers=config.NUM_WORKERS,
+    prefetch_factor=config.PREFETCH_FACTOR,
+    world_size=1,
+    rank=0,
+):
+    """
+    Builds a shuffled DataLoader over `df`.
+
+    Args:
+        world_size (int): Number of DistributedDataParallel processes. Above 1,
+            this rank only sees its shard of `df`: a `DistributedSampler` (or a
+            sharded `LengthBucketSampler` when `bucket_by_length`). Call
+            `set_epoch` / set `.epoch` on it each epoch for a fresh shuffle.
+        rank (int): Rank of the calling process.
+    """
+    labels = df["label_id"].astype(int).to_numpy()
+
+    if token_cache_dir:
+        # Tokenized once, then read from the on-disk mmap on later epochs and runs
+        token_cache = load_or_build_token_cache(
+            df["text"].astype(str).tolist(), tokenizer, max_len, token_cache_dir
+        )
+        dataset = PreTokenizedDataset(token_cache, labels)
+        collate_fn = PadCollator(tokenizer.pad_token_id or 0)
+        lengths = np.asarray(token_cache.lengths)
+    else:
+        dataset = SentimentDataset(reviews=df["text"].to_numpy(), labels=labels)
+        collate_fn = TokenizeCollator(tokenizer, max_len)
+        # Character length is a cheap proxy for token length
+        lengths = df["text"].astype(str).str.len().to_numpy()
+
+    loader_kwargs = {"collate_fn": collate_fn, "pin_memory": config.DEVICE == "cuda"}
+    if num_workers > 0:
+        loader_kwargs.update(
+            num_workers=num_workers,
+            persistent_workers=True,
+            prefetch_factor=prefetch_factor,
+        )
+
+    if bucket_by_length:
+        return DataLoader(
+            dataset,
+            batch_sampler=LengthBucketSampler(
+                lengths, batch_size, num_replicas=world_size, rank=rank
+            ),
+            **loader_kwargs,
+        )
+
+    if world_size > 1:
+        return DataLoader(
+            dataset,
+            batch_size=batch_size,
+            sampler=DistributedSampler(dataset, num_replicas=world_size, rank=rank, shuffle=True),
+            **loader_kwargs,
+        )
 
     return DataLoader(
         dataset,
         batch_size=batch_size,
-        shuffle=True
-    ) 
+        shuffle=True,
+        **loader_kwargs,
+    )
@@ -0,0 +1,165 @@
+import io
+import os
+import numpy as np
+import pandas as pd
+
+from array import array
+from typing import Optional, Sequence
+
+import config
+from src.model.data_extraction import DATA_COLUMNS
+
+
+def _ends_in_quoted_field(line: bytes, in_quotes: bool) -> bool:
+    """
+    Whether a CSV record is still inside a quoted field at the end of `line`
+    (and so goes on over the next line), given whether the line starts inside one.
+
+    Follows pandas' parser: a quote only opens a field when it is the field's
+    first character, `""` inside a quoted field is an escaped quote, and any
+    other quote (e.g. `my 5" screen`) is a literal character.
+    """
+    position, quoted, field_start = 0, in_quotes, not in_quotes
+    while position < len(line):
+        if quoted:
+            quote = line.find(b'"', position)
+            if quote < 0:
+                return True
+            if line[quote + 1 : quote + 2] == b'"':
+                position = quote + 2
+            else:
+                # Closing quote: anything up to the next comma is kept as-is
+                quoted, field_start, position = False, False, quote + 1
+        elif field_start and line[position : position + 1] == b'"':
+            quoted, position = True, position + 1
+        else:
+            comma = line.find(b",", position)
+            if comma < 0:
+                return False
+            field_start, position = True, comma + 1
+    return quoted
+
+
+class DatasetIndex:
+    """
+    Byte-offset index over a raw CSV/TXT dataset.
+
+    `offsets[i]` is the byte position where data row `i` starts and
+    `offsets[-1]` is the end of the last row, so reading any set of rows is a
+    seek + read of just those bytes. The index is saved next to the dataset
+    (`<data_path>.index.npz`) and rebuilt when the file's size or mtime change.
+    """
+
+    def __init__(self, data_path: str, offsets: np.ndarray, header: bytes):
+        self.data_path = data_path
+        self.offsets = offsets
+        self.header = header
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @staticmethod
+    def index_path(data_path: str) -> str:
+        return f"{data_path}.index.npz"
+
+    @staticmethod
+    def _file_signature(data_path: str) -> np.ndarray:
+        stat = os.stat(data_path)
+        return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+    @classmethod
+    def build(cls, data_path: str) -> "DatasetIndex":
+        """
+        Scans the file once and records where each CSV record starts. A record
+        only ends on a newline outside a quoted field, so quoted multi-line
+        texts are kept whole; blank lines are skipped like pandas does.
+        """
+        signature = cls._file_signature(data_path)
+        offsets = array("q")
+
+        with open(data_path, "rb") as f:
+            header = f.readline()
+            position = record_start = len(header)
+            in_quotes = False
+            for line in f:
+                if not in_quotes and not line.strip():
+                    position += len(line)
+                    record_start = position
+                    continue
+                if in_quotes or b'"' in line:
+                    in_quotes = _ends_in_quoted_field(line, in_quotes)
+                position += len(line)
+                if not in_quotes:
+                    offsets.append(record_start)
+                    record_start = position
+        offsets.append(position)
+
+        index = cls(data_path, np.frombuffer(offsets, dtype=np.int64), header)
+        np.savez(
+            cls.index_path(data_path),
+            offsets=index.offsets,
+            header=np.frombuffer(header, dtype=np.uint8),
+            signature=signature,
+        )
+        print(f"🗂️ Built dataset index: {len(index)} rows -> {cls.index_path(data_path)}")
+        return index
+
+    @classmethod
+    def load_or_build(cls, data_path: str = config.DATASET_PATH) -> "DatasetIndex":
+        """Loads the saved index, rebuilding it if missing or if the file changed."""
+        if not os.path.exists(data_path):
+            raise FileNotFoundError(f"Error: File {data_path} not found.")
+
+        index_path = cls.index_path(data_path)
+        if os.path.exists(index_path):
+            with np.load(index_path) as saved:
+                if np.array_equal(saved["signature"], cls._file_signature(data_path)):
+                    return cls(data_path, saved["offsets"], saved["header"].tobytes())
+            print(f"🔄 {data_path} changed since it was indexed, rebuilding the index")
+        return cls.build(data_path)
+
+    def read_rows(self, rows: Sequence[int]) -> pd.DataFrame:
+        """
+        Reads the given data rows (raw `text`/`label` columns), in the order given.
+        Consecutive rows are fetched with a single read.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return pd.DataFrame(columns=DATA_COLUMNS)
+        if rows.min() < 0 or rows.max() >= len(self):
+            raise IndexError(f"Row out of range for a dataset of {len(self)} rows.")
+
+        order = np.argsort(rows, kind="stable")
+        sorted_rows = rows[order]
+        runs = np.split(sorted_rows, np.flatnonzero(np.diff(sorted_rows) != 1) + 1)
+
+        parts = [self.header]
+        with open(self.data_path, "rb") as f:
+            for run in runs:
+                start, end = self.offsets[run[0]], self.offsets[run[-1] + 1]
+                f.seek(start)
+                parts.append(f.read(end - start))
+
+        df = pd.read_csv(io.BytesIO(b"".join(parts)), usecols=lambda c: c in DATA_COLUMNS)
+        if len(df) != len(rows):
+            raise ValueError(
+                f"Dataset index for {self.data_path} is out of sync; delete "
+                f"{self.index_path(self.data_path)} to rebuild it."
+            )
+
+        # Back from file order to the requested order
+        df.index = sorted_rows
+        return df.iloc[np.argsort(order, kind="stable")]
+
+    def read_range(self, start: int, stop: int) -> pd.DataFrame:
+        """Reads data rows [start, stop) with one seek and one read."""
+        return self.read_rows(np.arange(start, min(stop, len(self))))
+
+    def sample(
+        self, n: Optional[int] = None, frac: Optional[float] = None, random_state: int = 42
+    ) -> pd.DataFrame:
+        """Random sample of rows without replacement, reading only those rows."""
+        if n is None:
+            n = int(round(len(self) * frac))
+        rng = np.random.default_rng(random_state)
+        return self.read_rows(rng.choice(len(self), size=n, replace=False))
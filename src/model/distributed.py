@@ -0,0 +1,160 @@
+import os
+import math
+import torch
+import torch.nn as nn
+import torch.distributed as dist
+import torch.multiprocessing as mp
+import pandas as pd
+
+from datetime import datetime
+from torch.nn.parallel import DistributedDataParallel
+from torch.optim import AdamW
+from transformers import AutoTokenizer, get_scheduler
+
+import config
+from src.model.dataloader import create_dataloader, LengthBucketSampler
+from src.model.evaluate import evaluate
+from src.model.model import SentimentClassifier
+from src.model.trainer import train_epoch, push_model_to_hub, save_training_history
+from src.serving.threads import available_cpus
+
+
+def init_distributed(rank: int, world_size: int, master_port: str = config.DDP_MASTER_PORT):
+    """
+    Joins the local gloo process group and gives this rank its share of the cores
+    (the container's CPU limit, not the host's core count), so N ranks don't
+    each spawn one intra-op thread per core.
+    """
+    os.environ.setdefault("MASTER_ADDR", "127.0.0.1")
+    os.environ["MASTER_PORT"] = str(master_port)
+    dist.init_process_group("gloo", rank=rank, world_size=world_size)
+    torch.set_num_threads(max(available_cpus() // world_size, 1))
+
+
+def set_loader_epoch(loader, epoch: int):
+    """Reseeds the shard shuffle of a DDP dataloader for `epoch`."""
+    if isinstance(loader.batch_sampler, LengthBucketSampler):
+        loader.batch_sampler.epoch = epoch
+    elif hasattr(loader.sampler, "set_epoch"):
+        loader.sampler.set_epoch(epoch)
+
+
+def all_reduce_mean(*values: float):
+    """Averages python floats over all ranks."""
+    tensor = torch.tensor(values, dtype=torch.float64)
+    dist.all_reduce(tensor, op=dist.ReduceOp.SUM)
+    return (tensor / dist.get_world_size()).tolist()
+
+
+def _train_worker(
+    rank: int,
+    world_size: int,
+    train_df: pd.DataFrame,
+    val_df: pd.DataFrame,
+    epochs: int,
+    lr: float,
+    run_folder: str,
+    master_port: str,
+):
+    init_distributed(rank, world_size, master_port)
+    is_main = rank == 0
+    device = "cpu"
+
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(config.TOKENIZER_NAME)
+        # Each rank tokenizes its own shard in-process: the cores are already busy
+        train_loader = create_dataloader(
+            train_df, tokenizer, config.MAX_LEN, config.BATCH_SIZE,
+            bucket_by_length=config.BUCKET_BY_LENGTH, num_workers=0,
+            world_size=world_size, rank=rank,
+        )
+        val_loader = create_dataloader(
+            val_df, tokenizer, config.MAX_LEN, config.BATCH_SIZE, num_workers=0
+        )
+
+        model = SentimentClassifier(n_classes=config.N_CLASSES)
+        # DDP broadcasts rank 0's weights, so every replica starts identical
+        ddp_model = DistributedDataParallel(model)
+        loss_fn = nn.CrossEntropyLoss()
+        optimizer = AdamW(ddp_model.parameters(), lr=lr, weight_decay=1e-2)
+        scheduler = get_scheduler(
+            "linear",
+            optimizer=optimizer,
+            num_warmup_steps=0,
+            num_training_steps=math.ceil(len(train_loader) / config.GRAD_ACCUM_STEPS) * epochs,
+        )
+
+        best_val_acc = 0
+        history = {"train_loss": [], "train_acc": [], "val_loss": [], "val_acc": []}
+
+        for epoch in range(epochs):
+            if is_main:
+                print(f"Epoch {epoch + 1}/{epochs}")
+                print(f"{'-' * 10}")
+            set_loader_epoch(train_loader, epoch)
+
+            train_loss, train_acc = train_epoch(
+                ddp_model, train_loader, loss_fn, optimizer, scheduler, device,
+                show_progress=is_main,
+            )
+            train_loss, train_acc = all_reduce_mean(train_loss, train_acc)
+
+            # Replicas hold the same weights: rank 0 validates and saves, the others wait
+            if is_main:
+                val_loss, val_acc, _, _, _ = evaluate(model, val_loader, loss_fn, device, compiled=False)
+
+                print(f"Train Loss: {train_loss:.4f}, Train Accuracy: {train_acc:.4f}")
+                print(f"Val   Loss: {val_loss:.4f}, Val   Accuracy: {val_acc:.4f}\n")
+
+                history["train_loss"].append(train_loss)
+                history["train_acc"].append(train_acc)
+                history["val_loss"].append(val_loss)
+                history["val_acc"].append(val_acc)
+
+                if val_acc > best_val_acc:
+                    torch.save(model.state_dict(), config.BEST_MODEL_PATH)
+                    print(f"✨ New best model saved locally: {config.BEST_MODEL_PATH}\n")
+                    best_val_acc = val_acc
+            dist.barrier()
+
+        if is_main:
+            timestamp = datetime.now().strftime("%d-%m-%Y-%H-%M-%S")
+            run_dir = os.path.join(run_folder, f"run_{timestamp}")
+            os.makedirs(run_dir, exist_ok=True)
+
+            push_model_to_hub(config.BEST_MODEL_PATH)
+            save_training_history(history, run_dir)
+    finally:
+        dist.destroy_process_group()
+
+
+def train_distributed(
+    train_df: pd.DataFrame,
+    val_df: pd.DataFrame,
+    world_size: int = config.DDP_WORLD_SIZE,
+    epochs: int = config.EPOCHS,
+    lr: float = config.LEARNING_RATE,
+    run_folder: str = config.MODEL_TRAINING_OUTPUT_DIR,
+    master_port: str = config.DDP_MASTER_PORT,
+) -> SentimentClassifier:
+    """
+    Data-parallel version of `train_model` on CPU: launches `world_size` local
+    processes joined by a gloo DistributedDataParallel group. Each one trains on
+    its `DistributedSampler` shard of `train_df` and gradients are averaged at
+    every backward pass. Only rank 0 validates, saves `BEST_MODEL_PATH` and
+    writes `training_history.json`.
+
+    Returns:
+        SentimentClassifier: The best model, reloaded from `BEST_MODEL_PATH`.
+    """
+    print(f"🚀 Launching {world_size} DDP training processes (gloo)\n")
+    mp.spawn(
+        _train_worker,
+        args=(world_size, train_df, val_df, epochs, lr, run_folder, master_port),
+        nprocs=world_size,
+        join=True,
+    )
+
+    model = SentimentClassifier(n_classes=config.N_CLASSES)
+    model.load_state_dict(torch.load(config.BEST_MODEL_PATH, map_location=config.DEVICE))
+    return model.to(config.DEVICE)
@@ -16,12 +16,29 @@ from typing import Tuple, List
 from torch.utils.data import DataLoader
 from sklearn.metrics import confusion_matrix, classification_report
 
-def evaluate(model: Module, data_loader: DataLoader, loss_fn: nn.Module, device: torch.device):
+import config
+from src.model.inference import InferenceEngine
+
+def evaluate(
+    model: Module,
+    data_loader: DataLoader,
+    loss_fn: nn.Module,
+    device: torch.device,
+    compiled: bool = config.COMPILE_INFERENCE,
+):
     """
     Evaluates the model on validation data.
+    `model` may be a SentimentClassifier or an InferenceEngine wrapping one.
+    With `compiled`, a bare model is run through freshly built frozen graphs
+    (they capture the current weights, so they're rebuilt on every call).
+    Per-epoch validation during training passes `compiled=False`: the
+    weights change every epoch and compiling costs more than it saves.
     """
-  
-    model.eval()
+    engine = (
+        model
+        if isinstance(model, InferenceEngine)
+        else InferenceEngine(model, device=device, compiled=compiled)
+    )
     total_loss = 0
     correct_predictions = 0
     total_samples = 0
@@ -32,16 +49,16 @@ def evaluate(model: Module, data_loader: DataLoader, loss_fn: nn.Module, device:
 
     with torch.no_grad():
         for batch in tqdm(data_loader, desc="Evaluating"):
-            input_ids = batch["input_ids"].to(device)
-            attention_mask = batch["attention_mask"].to(device)
             labels = batch["labels"].to(device)
 
-            outputs = model(input_ids=input_ids, attention_mask=attention_mask)
+            # Single forward pass; loss and probabilities share the logits
+            outputs = engine.forward(batch["input_ids"], batch["attention_mask"])
 
             loss = loss_fn(outputs, labels)
             total_loss += loss.item()
 
-            probs = torch.softmax(outputs, dim=1)  # Convert logits to probabilities
+            # Convert logits to probabilities, over the trained (label map) classes like serving
+            probs = torch.softmax(outputs[:, : len(engine.label_mapping)], dim=1)
             predictions = torch.argmax(probs, dim=1)
 
             correct_predictions += (predictions == labels).sum().item()
@@ -76,7 +93,7 @@ def plot_confusion_matrix(
     Notes:
         The confusion matrix is saved as a heatmap. Each class is represented on both axes.
     """
-    cm = confusion_matrix(y_true, y_pred)
+    cm = confusion_matrix(y_true, y_pred, labels=list(range(len(class_names))))
     plt.figure(figsize=(8, 6))
     sns.heatmap(
         cm,
@@ -111,8 +128,14 @@ def plot_classification_report(
         - Uses `classification_report` from `sklearn` to calculate precision, recall, and F1-score.
         - `zero_division=0` is used to avoid division by zero errors (replaces undefined values with 0).
     """
+    # Fixed labels: a small test split may not contain every class
     report = classification_report(
-        y_true, y_pred, target_names=class_names, output_dict=True, zero_division=0
+        y_true,
+        y_pred,
+        labels=list(range(len(class_names))),
+        target_names=class_names,
+        output_dict=True,
+        zero_division=0,
     )
     df = pd.DataFrame(report).T
 
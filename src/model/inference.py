@@ -1,15 +1,45 @@
-from src.model.model import sentimentClassifier
+import argparse
+import pandas as pd
 
-import os
 import config
+# The engines live in the lean serving package; re-exported for training code
+from src.serving.engine import BaseInferenceEngine, get_label_mapping
+from src.serving.torch_engine import InferenceEngine, load_classifier, quantize_classifier
 
-def load_classifier()
-   # Initialize model
-   model = SentimentClassifier(n_classes=config.N_CLASSES).to(config.DEVICE)
-   best_model_path = os.path.join(config.MODEL_TRAINING_OUTPUT_DIR, "best_model.pth")
-  
-  if os.path.exists(best_model_path):
-     print(f"🔄 Loading previous model from {best_model_path}")
-     model.load_state_dict(torch.load(best_model_path, map_location=config.DEVICE))
-  else: 
-    
+
+def score_dataframe(
+    engine: BaseInferenceEngine, df: pd.DataFrame, batch_size: int = config.BATCH_SIZE
+) -> pd.DataFrame:
+    """
+    Offline scoring: adds prediction, prediction_label and confidence columns
+    to a dataframe with a `text` column.
+    """
+    predictions = []
+    texts = df["text"].astype(str).tolist()
+    for start in range(0, len(texts), batch_size):
+        predictions.extend(engine.predict(texts[start : start + batch_size]))
+
+    scored = df.copy()
+    scored["prediction"] = [p["prediction"] for p in predictions]
+    scored["prediction_label"] = [p["prediction_label"] for p in predictions]
+    scored["confidence"] = [p["confidence"] for p in predictions]
+    return scored
+
+
+def main():
+    from src.model.data_extraction import load_file_by_type
+
+    parser = argparse.ArgumentParser(description="Score a file of texts offline.")
+    parser.add_argument("input_path", help="CSV/TXT/JSON/XLSX file with a 'text' column")
+    parser.add_argument("output_path", help="CSV file to write predictions to")
+    parser.add_argument("--model-path", default=config.BEST_MODEL_PATH)
+    args = parser.parse_args()
+
+    engine = InferenceEngine.from_checkpoint(args.model_path)
+    scored = score_dataframe(engine, load_file_by_type(args.input_path))
+    scored.to_csv(args.output_path, index=False)
+    print(f"📄 Saved predictions: {args.output_path}\n")
+
+
+if __name__ == "__main__":
+    main()
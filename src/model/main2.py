@@ -1,30 +1,38 @@
+import os
 import torch
 from sklearn.model_selection import train_test_split
 from transformers import AutoTokenizer
 
 import config
-from src.model.data_extraction import load_data
+from src.model.data_extraction import prepare_dataframe
+from src.model.dataset_index import DatasetIndex
 from src.model.data_processing import preprocess_data
 from src.model.dataloader import create_dataloader
 from src.model.model import SentimentClassifier
 from src.model.trainer import train_model
+from src.model.distributed import train_distributed
 from src.model.evaluate import evaluate_and_plot
+from src.model.inference import get_label_mapping
 
-def dataloader_train_test_val(df):
+def dataloader_train_test_val(df, bucket_by_length=False):
   tokenizer = AutoTokenizer.from_pretrained(config.TOKENIZER_NAME)
-  data = create_dataloader(df, tokenizer, max_len=config.MAX_LEN, batch_size=config.BATCH_SIZE)
+  data = create_dataloader(df, tokenizer, max_len=config.MAX_LEN, batch_size=config.BATCH_SIZE, bucket_by_length=bucket_by_length, token_cache_dir=config.TOKEN_CACHE_DIR)
   return data
 
 def main():
+  # DataLoader workers tokenize in parallel already; keep the tokenizer single-threaded in each
+  os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
   # Step 1 : Data loading and tokenizer
   print("Loading dataset and tokenizer\n")
   
-  # Load dataset using data_extraction file's function
-  data = load_data(config.DATASET_PATH, merge_labels=True)
+  # Byte-offset index over the dataset (built once, rebuilt if the file changes)
+  index = DatasetIndex.load_or_build(config.DATASET_PATH)
 
-  # ⚡ Reduce dataset temporarily for faster testing
-  SMALL_FRAC = 0.05  # 1% of the dataset
-  data = data.sample(frac=SMALL_FRAC, random_state=42).reset_index(drop=True)
+  # ⚡ Reduce dataset temporarily for faster testing: only the sampled rows are read
+  data = prepare_dataframe(
+    index.sample(frac=config.SMALL_FRAC, random_state=42), merge_labels=config.MERGE_LABELS
+  ).reset_index(drop=True)
   print(f"Using {len(data)} samples for quick testing.")
 
 
@@ -33,32 +41,36 @@ def main():
 
   print("preprocesing dataset\n")
   # Apply preprocessing using data_processing file's fucntion
-  train_data, val_data = preprocess_data(train_data_raw, test_size=config.VAL_SIZE, max_length=config.MAX_LEN)
+  train_data, val_data = preprocess_data(train_data_raw, test_size=config.VAL_SIZE)
 
   # tokenizer = AutoTokenizer.from_pretrained(config.TOKENIZER_NAME)
 
   # Step 2 : Dataloader
   print("Creating dataloaders\n") 
   # Creating dataloader using datalaoder file's function
-  train_data = dataloader_train_test_val(train_data)
   test_data = dataloader_train_test_val(test_data_raw)
-  val_data = dataloader_train_test_val(val_data)
 
   #Step 3 : modeling
-  # Initializing model
-  print("Initializing model\n")
-  model = SentimentClassifier(n_classes=config.N_CLASSES).to(config.DEVICE)
-
-  # Training model
-  print("Training model\n")
-  trained_model = train_model(model, train_data, val_data, device=config.DEVICE, epochs=config.EPOCHS)
+  if config.DDP_WORLD_SIZE > 1:
+    # Data-parallel on CPU: each process builds the dataloader of its own shard
+    print("Training model\n")
+    trained_model = train_distributed(train_data, val_data, world_size=config.DDP_WORLD_SIZE, epochs=config.EPOCHS)
+  else:
+    train_data = dataloader_train_test_val(train_data, bucket_by_length=config.BUCKET_BY_LENGTH)
+    val_data = dataloader_train_test_val(val_data)
+
+    # Initializing model
+    print("Initializing model\n")
+    model = SentimentClassifier(n_classes=config.N_CLASSES).to(config.DEVICE)
+
+    # Training model
+    print("Training model\n")
+    trained_model = train_model(model, train_data, val_data, device=config.DEVICE, epochs=config.EPOCHS)
 
   # Evaluate model 
   print("Evaluating model\n")
 
-  sentiment_mapper = (
-        config.SENTIMENT_MAPPING if config.N_CLASSES == 5 else config.SENTIMENT_MAPPING_3_LABEL_VERSION
-    )
+  sentiment_mapper = get_label_mapping()
 
   evaluate_and_plot(
           trained_model,
@@ -1,16 +1,30 @@
 import os
+import math
+import argparse
 import torch
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from transformers import AutoTokenizer
 
 import config
-from src.model.data_extraction import load_data
+from src.model.data_extraction import prepare_dataframe
+from src.model.dataset_index import DatasetIndex
 from src.model.data_processing import preprocess_data
-from src.model.dataloader import create_dataloader
+from src.model.dataloader import create_dataloader, LengthBucketSampler
 from src.model.model import SentimentClassifier
-from src.model.trainer import train_model
-from src.model.evaluate import evaluate_and_plot
+from src.model.trainer import (
+    train_epoch,
+    save_checkpoint,
+    load_checkpoint,
+    restore_checkpoint,
+    push_model_to_hub,
+    save_training_history,
+)
+from src.model.evaluate import evaluate, evaluate_and_plot
+from src.model.inference import get_label_mapping
+from torch.optim import AdamW
+from transformers import get_scheduler
+from datetime import datetime
 
 from huggingface_hub import hf_hub_download
 # ------------------------------------------
@@ -29,112 +43,210 @@ def update_last_chunk_state(chunk_idx, state_file="last_chunk.txt"):
     with open(state_file, "w") as f:
         f.write(str(chunk_idx))
 
-def dataloader_train_test_val(df):
-    tokenizer = AutoTokenizer.from_pretrained(config.TOKENIZER_NAME)
+def dataloader_train_test_val(df, tokenizer, bucket_by_length=False):
     data = create_dataloader(
-        df, tokenizer, max_len=config.MAX_LEN, batch_size=config.BATCH_SIZE
+        df,
+        tokenizer,
+        max_len=config.MAX_LEN,
+        batch_size=config.BATCH_SIZE,
+        bucket_by_length=bucket_by_length,
+        token_cache_dir=config.TOKEN_CACHE_DIR,
     )
     return data
 
+def load_initial_weights(model):
+    """Starts from the local best model, else the Hub copy, else from scratch."""
+    if os.path.exists(config.BEST_MODEL_PATH):
+        print(f"🔄 Loading previous model from {config.BEST_MODEL_PATH}")
+        model.load_state_dict(torch.load(config.BEST_MODEL_PATH, map_location=config.DEVICE))
+        return
+
+    try:
+        print("🌐 No local model found, trying to download from Hugging Face Hub...")
+        hf_model_path = hf_hub_download(
+            repo_id=config.HF_REPO_ID,   # 👈 hugging face repo
+            filename="best_model.pth",
+            local_dir=os.path.dirname(config.BEST_MODEL_PATH),
+            force_download=False
+        )
+        model.load_state_dict(torch.load(hf_model_path, map_location=config.DEVICE))
+        print("✅ Loaded model from Hugging Face Hub")
+    except Exception as e:
+        print(f"⚠️ Could not load model from Hugging Face Hub: {e}")
+        print("➡️ Starting training from scratch.")
+
+def chunk_dataloaders(index, chunk_idx, chunk_size, tokenizer):
+    """Reads one chunk (seek + read) and builds its train/val/test dataloaders."""
+    start_idx = chunk_idx * chunk_size
+    end_idx = min((chunk_idx + 1) * chunk_size, len(index))
+    # Seek straight to the chunk: only its rows are read and parsed
+    data_chunk = prepare_dataframe(
+        index.read_range(start_idx, end_idx), merge_labels=config.MERGE_LABELS
+    ).reset_index(drop=True)
+
+    # Split train/val/test (fixed seeds: a resumed chunk gets the same split)
+    train_data_raw, test_data_raw = train_test_split(
+        data_chunk, test_size=config.TEST_SIZE, random_state=42
+    )
+    train_data, val_data = preprocess_data(train_data_raw, test_size=config.VAL_SIZE)
+
+    return (
+        len(data_chunk),
+        dataloader_train_test_val(train_data, tokenizer, bucket_by_length=config.BUCKET_BY_LENGTH),
+        dataloader_train_test_val(val_data, tokenizer),
+        dataloader_train_test_val(test_data_raw, tokenizer),
+    )
+
 # ------------------------------------------
 # Main training loop
 # ------------------------------------------
 
-def main():
-    print("Loading dataset...\n")
+def train_chunks(max_chunks=1, checkpoint_path=config.TRAINING_CHECKPOINT_PATH):
+    """
+    Trains through up to `max_chunks` chunks (None = all remaining) in one process.
 
-    # Load dataset
-    data = load_data(config.DATASET_PATH, merge_labels=True)
+    Tokenizer, model, AdamW and the linear scheduler are built once and carried
+    across chunks. After every epoch, model, optimizer, scheduler, RNG states and
+    the (chunk, epoch) cursor are checkpointed together, so a crash resumes at the
+    last finished epoch with the learning-rate schedule intact.
+    """
+    print("Loading dataset index...\n")
+
+    # Byte offsets of every row: built once, reused until the file changes
+    index = DatasetIndex.load_or_build(config.DATASET_PATH)
+    n_rows = len(index)
 
     # Decide chunk size (e.g., 1%)
     CHUNK_FRAC = 0.01
-    chunk_size = int(len(data) * CHUNK_FRAC)
-    n_chunks = (len(data) // chunk_size) + int(len(data) % chunk_size != 0)
-
-    # Get last processed chunk
-    last_chunk = get_last_chunk_state()
-    next_chunk = last_chunk + 1
-
-    if next_chunk >= n_chunks:
-        print("✅ All chunks have already been processed.")
-        return
+    chunk_size = max(int(n_rows * CHUNK_FRAC), 1)
+    n_chunks = (n_rows // chunk_size) + int(n_rows % chunk_size != 0)
 
-    # Select the next chunk
-    start_idx = next_chunk * chunk_size
-    end_idx = min((next_chunk + 1) * chunk_size, len(data))
-    data_chunk = data.iloc[start_idx:end_idx].reset_index(drop=True)
-
-    print(f"Using chunk {next_chunk+1}/{n_chunks} with {len(data_chunk)} samples")
+    tokenizer = AutoTokenizer.from_pretrained(config.TOKENIZER_NAME)
+    model = SentimentClassifier(n_classes=config.N_CLASSES).to(config.DEVICE)
+    loss_fn = torch.nn.CrossEntropyLoss()
+    optimizer = AdamW(model.parameters(), lr=config.LEARNING_RATE, weight_decay=1e-2)
 
-    # Split train/val/test
-    train_data_raw, test_data_raw = train_test_split(
-        data_chunk, test_size=config.TEST_SIZE, random_state=42
-    )
-    train_data, val_data = preprocess_data(
-        train_data_raw, test_size=config.VAL_SIZE, max_length=config.MAX_LEN
+    if os.path.exists(checkpoint_path):
+        # Resume: the schedule length must match the one the checkpoint was made with
+        checkpoint = load_checkpoint(checkpoint_path, config.DEVICE)
+        total_steps = checkpoint["training_state"]["total_steps"]
+    else:
+        checkpoint = None
+        # One linear decay over every remaining chunk of the dataset
+        first_chunk = get_last_chunk_state() + 1
+        train_rows_per_chunk = chunk_size * (1 - config.TEST_SIZE) * (1 - config.VAL_SIZE)
+        total_steps = (
+            math.ceil(math.ceil(train_rows_per_chunk / config.BATCH_SIZE) / config.GRAD_ACCUM_STEPS)
+            * config.EPOCHS
+            * max(n_chunks - first_chunk, 1)
+        )
+    scheduler = get_scheduler(
+        "linear", optimizer=optimizer, num_warmup_steps=0, num_training_steps=total_steps
     )
 
-    # Dataloaders
-    train_data = dataloader_train_test_val(train_data)
-    val_data = dataloader_train_test_val(val_data)
-    test_data = dataloader_train_test_val(test_data_raw)
-
-    # # Initialize or load model
-    # model = SentimentClassifier(n_classes=config.N_CLASSES).to(config.DEVICE)
-    # best_model_path = os.path.join(
-    #     config.MODEL_TRAINING_OUTPUT_DIR, "best_model.pth"
-    # )
-    # if os.path.exists(best_model_path):
-    #     print(f"🔄 Loading previous model from {best_model_path}")
-    #     model.load_state_dict(torch.load(best_model_path, map_location=config.DEVICE))
-
-    # Initialize model
-    model = SentimentClassifier(n_classes=config.N_CLASSES).to(config.DEVICE)
-    best_model_path = os.path.join(config.MODEL_TRAINING_OUTPUT_DIR, "best_model.pth")
-    
-    if os.path.exists(best_model_path):
-        print(f"🔄 Loading previous model from {best_model_path}")
-        model.load_state_dict(torch.load(best_model_path, map_location=config.DEVICE))
-    
+    if checkpoint is not None:
+        state = restore_checkpoint(checkpoint, model, optimizer, scheduler)
+        del checkpoint
+        print(f"♻️ Resuming from {checkpoint_path}: chunk {state['chunk'] + 1}, epoch {state['epoch'] + 1}")
     else:
-        try:
-            print("🌐 No local model found, trying to download from Hugging Face Hub...")
-            hf_model_path = hf_hub_download(
-                repo_id="Adelanseur/MLOps-Project",   # 👈 hugging face repo
-                filename="best_model.pth",
-                local_dir=config.MODEL_TRAINING_OUTPUT_DIR,
-                force_download=False
+        load_initial_weights(model)
+        state = {
+            "chunk": get_last_chunk_state() + 1,
+            "epoch": 0,
+            "best_val_acc": 0,
+            "history": {"train_loss": [], "train_acc": [], "val_loss": [], "val_acc": []},
+            "total_steps": total_steps,
+        }
+
+    chunks_done = 0
+    while state["chunk"] < n_chunks and (max_chunks is None or chunks_done < max_chunks):
+        chunk_idx = state["chunk"]
+        n_samples, train_data, val_data, test_data = chunk_dataloaders(
+            index, chunk_idx, chunk_size, tokenizer
+        )
+        print(f"Using chunk {chunk_idx+1}/{n_chunks} with {n_samples} samples")
+
+        # Train on this chunk
+        print("Training model...\n")
+        for epoch in range(state["epoch"], config.EPOCHS):
+            print(f"Epoch {epoch + 1}/{config.EPOCHS}")
+            print(f"{'-' * 10}")
+            if isinstance(train_data.batch_sampler, LengthBucketSampler):
+                train_data.batch_sampler.epoch = epoch  # same batch order as an uninterrupted run
+
+            train_loss, train_acc = train_epoch(
+                model, train_data, loss_fn, optimizer, scheduler, config.DEVICE
             )
-            model.load_state_dict(torch.load(hf_model_path, map_location=config.DEVICE))
-            print("✅ Loaded model from Hugging Face Hub")
-        except Exception as e:
-            print(f"⚠️ Could not load model from Hugging Face Hub: {e}")
-            print("➡️ Starting training from scratch.")
-
-    # Train on this chunk
-    print("Training model...\n")
-    trained_model = train_model(
-        model, train_data, val_data, device=config.DEVICE, epochs=config.EPOCHS
-    )
+            val_loss, val_acc, _, _, _ = evaluate(model, val_data, loss_fn, config.DEVICE, compiled=False)
+
+            print(f"Train Loss: {train_loss:.4f}, Train Accuracy: {train_acc:.4f}")
+            print(f"Val   Loss: {val_loss:.4f}, Val   Accuracy: {val_acc:.4f}\n")
+
+            for key, value in zip(
+                ["train_loss", "train_acc", "val_loss", "val_acc"],
+                [train_loss, train_acc, val_loss, val_acc],
+            ):
+                state["history"][key].append(value)
+
+            # Save locally if it's the best so far on this chunk
+            if val_acc > state["best_val_acc"]:
+                torch.save(model.state_dict(), config.BEST_MODEL_PATH)
+                print(f"✨ New best model saved locally: {config.BEST_MODEL_PATH}\n")
+                state["best_val_acc"] = val_acc
+
+            state["epoch"] = epoch + 1
+            save_checkpoint(checkpoint_path, model, optimizer, scheduler, state)
+
+        timestamp = datetime.now().strftime("%d-%m-%Y-%H-%M-%S")
+        run_dir = os.path.join(config.MODEL_TRAINING_OUTPUT_DIR, f"run_{timestamp}")
+        os.makedirs(run_dir, exist_ok=True)
+        save_training_history(state["history"], run_dir)
+
+        # Evaluate
+        print("Evaluating model...\n")
+        sentiment_mapper = get_label_mapping()
+        evaluate_and_plot(
+            model,
+            test_data,
+            loss_fn,
+            config.DEVICE,
+            class_names=list(sentiment_mapper.values()),
+            run_folder=config.MODEL_EVALUATION_OUTPUT_DIR,
+        )
+
+        # Save progress: move the cursor to the next chunk
+        update_last_chunk_state(chunk_idx)
+        state.update(
+            chunk=chunk_idx + 1,
+            epoch=0,
+            best_val_acc=0,
+            history={"train_loss": [], "train_acc": [], "val_loss": [], "val_acc": []},
+        )
+        save_checkpoint(checkpoint_path, model, optimizer, scheduler, state)
+        chunks_done += 1
+
+    if state["chunk"] >= n_chunks:
+        print("✅ All chunks have already been processed.")
 
-    # Save progress
-    update_last_chunk_state(next_chunk)
+    # --- Push once, at the end of the run ---
+    if chunks_done:
+        push_model_to_hub(config.BEST_MODEL_PATH)
 
-    # Evaluate
-    print("Evaluating model...\n")
-    sentiment_mapper = (
-        config.SENTIMENT_MAPPING
-        if config.N_CLASSES == 5
-        else config.SENTIMENT_MAPPING_3_LABEL_VERSION
-    )
-    evaluate_and_plot(
-        trained_model,
-        test_data,
-        torch.nn.CrossEntropyLoss(),
-        config.DEVICE,
-        class_names=list(sentiment_mapper.values()),
-        run_folder=config.MODEL_EVALUATION_OUTPUT_DIR,
+
+def main():
+    parser = argparse.ArgumentParser(description="Train on the dataset chunk by chunk.")
+    parser.add_argument(
+        "--max-chunks",
+        type=int,
+        default=1,
+        help="Chunks to train on in this process (0 = all remaining chunks).",
     )
+    parser.add_argument("--checkpoint-path", default=config.TRAINING_CHECKPOINT_PATH)
+    args = parser.parse_args()
+
+    # DataLoader workers tokenize in parallel already; keep the tokenizer single-threaded in each
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    train_chunks(max_chunks=args.max_chunks or None, checkpoint_path=args.checkpoint_path)
 
 
 if __name__ == "__main__":
@@ -2,7 +2,8 @@ import torch
 import torch.nn as nn
 import config
 
-from transformers import BertModel
+from typing import Optional
+from transformers import BertConfig, BertModel
 
 
 class SentimentClassifier(nn.Module):
@@ -15,6 +16,7 @@ class SentimentClassifier(nn.Module):
         n_classes: int,
         model_name: str = config.MODEL_NAME,
         dropout_prob: float = 0.3,
+        bert_config: Optional[BertConfig] = None,
     ):
         """
         Initializes the Sentiment Classifier.
@@ -23,9 +25,15 @@ class SentimentClassifier(nn.Module):
             n_classes (int): Number of output classes (e.g., 5 for sentiment classification).
             model_name (str): Pretrained BERT model name.
             dropout_prob (float): Dropout probability for regularization.
+            bert_config (BertConfig): If given, BERT is built from this config alone,
+                without reading `model_name`'s pretrained weights (for serving, where
+                trained weights are loaded right after).
         """
         super(SentimentClassifier, self).__init__()
-        self.bert = BertModel.from_pretrained(model_name)
+        if bert_config is not None:
+            self.bert = BertModel(bert_config)
+        else:
+            self.bert = BertModel.from_pretrained(model_name)
         self.dropout = nn.Dropout(p=dropout_prob)
         self.fc = nn.Linear(self.bert.config.hidden_size, n_classes)
 
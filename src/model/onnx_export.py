@@ -0,0 +1,76 @@
+import os
+import json
+import argparse
+import torch
+
+from transformers import AutoTokenizer
+
+import config
+from src.model.inference import get_label_mapping, load_classifier
+
+
+def export_onnx(
+    model_path: str = config.BEST_MODEL_PATH,
+    export_dir: str = config.ONNX_EXPORT_DIR,
+    opset: int = 17,
+) -> str:
+    """
+    Exports the trained SentimentClassifier to `<export_dir>/model.onnx` with
+    dynamic batch and sequence axes, next to everything the ONNX Runtime backend
+    needs at serve time: `tokenizer.json` and `meta.json` (labels, max_len).
+
+    Returns:
+        str: Path of the exported `model.onnx`.
+    """
+    model = load_classifier(model_path, "cpu")
+    tokenizer = AutoTokenizer.from_pretrained(config.TOKENIZER_NAME)
+    os.makedirs(export_dir, exist_ok=True)
+
+    dummy = tokenizer(["a short review", "a slightly longer review to pad"], padding=True, return_tensors="pt")
+    onnx_path = os.path.join(export_dir, "model.onnx")
+    torch.onnx.export(
+        model,
+        (dummy["input_ids"], dummy["attention_mask"]),
+        onnx_path,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"},
+        },
+        opset_version=opset,
+        dynamo=False,
+    )
+
+    # Fast-tokenizer file: loaded with `tokenizers` alone, without transformers
+    tokenizer.backend_tokenizer.save(os.path.join(export_dir, "tokenizer.json"))
+    with open(os.path.join(export_dir, "meta.json"), "w") as f:
+        json.dump(
+            {
+                "labels": get_label_mapping(),
+                "max_len": config.MAX_LEN,
+                "pad_token": tokenizer.pad_token,
+                "pad_token_id": tokenizer.pad_token_id,
+                "source_checkpoint": os.path.abspath(model_path),
+            },
+            f,
+            indent=4,
+        )
+
+    print(f"📦 Exported ONNX model: {onnx_path}")
+    return onnx_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the trained model to ONNX.")
+    parser.add_argument("--model-path", default=config.BEST_MODEL_PATH)
+    parser.add_argument("--export-dir", default=config.ONNX_EXPORT_DIR)
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    export_onnx(args.model_path, args.export_dir, args.opset)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import os
+import json
+import argparse
+import numpy as np
+import torch
+import torch.nn as nn
+
+from time import perf_counter
+from datetime import datetime
+from torch.utils.data import DataLoader
+from transformers import AutoTokenizer
+
+import config
+from src.model.data_extraction import prepare_dataframe
+from src.model.dataloader import SentimentDataset, TokenizeCollator
+from src.model.dataset_index import DatasetIndex
+from src.model.evaluate import evaluate
+from src.model.inference import InferenceEngine, load_classifier, quantize_classifier
+from src.model.model import SentimentClassifier
+
+
+def quantize_checkpoint(
+    model_path: str = config.BEST_MODEL_PATH,
+    quantized_path: str = config.QUANTIZED_MODEL_PATH,
+) -> SentimentClassifier:
+    """
+    Builds the int8 artifact from `best_model.pth` and saves its state dict to
+    `quantized_path` (loaded back with `load_classifier(..., quantized=True)`).
+    """
+    quantized = quantize_classifier(load_classifier(model_path, "cpu"))
+    os.makedirs(os.path.dirname(quantized_path) or ".", exist_ok=True)
+    torch.save(quantized.state_dict(), quantized_path)
+    print(f"🗜️ Saved int8 model: {quantized_path}")
+    return quantized
+
+
+def measure_latency(engine: InferenceEngine, texts, batch_size: int = 1, repeats: int = 3) -> dict:
+    """Per-call latency of `engine.predict_proba` (ms), after one warm-up call."""
+    batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+    engine.predict_proba(batches[0])
+
+    timings = []
+    for _ in range(repeats):
+        for batch in batches:
+            start = perf_counter()
+            engine.predict_proba(batch)
+            timings.append((perf_counter() - start) * 1000)
+
+    return {
+        "p50_ms": round(float(np.percentile(timings, 50)), 2),
+        "p95_ms": round(float(np.percentile(timings, 95)), 2),
+    }
+
+
+def compare_models(
+    engines: dict,
+    data_loader: DataLoader,
+    texts,
+    model_paths: dict,
+    run_folder: str = config.MODEL_EVALUATION_OUTPUT_DIR,
+) -> dict:
+    """
+    Runs every engine through `evaluate()` on the same data and writes a JSON
+    report with accuracy, loss, throughput, single-text latency, artifact size
+    and how often each variant agrees with the first (reference) one.
+
+    Args:
+        engines (dict): Variant name -> InferenceEngine, reference first.
+        data_loader (DataLoader): Labelled evaluation batches, in a fixed order.
+        texts (List[str]): Raw texts used for the latency measurement.
+        model_paths (dict): Variant name -> artifact path, for the size column.
+        run_folder (str): Where the `quantization_<timestamp>` folder is created.
+    """
+    loss_fn = nn.CrossEntropyLoss()
+    report, reference_pred = {}, None
+    n_samples = len(data_loader.dataset)
+
+    for name, engine in engines.items():
+        start = perf_counter()
+        loss, accuracy, _, y_pred, _ = evaluate(engine, data_loader, loss_fn, engine.device)
+        elapsed = perf_counter() - start
+
+        y_pred = np.asarray(y_pred)
+        if reference_pred is None:
+            reference_pred = y_pred
+
+        report[name] = {
+            "accuracy": round(accuracy, 4),
+            "loss": round(loss, 4),
+            "eval_samples_per_sec": round(n_samples / elapsed, 1),
+            "latency_single_text": measure_latency(engine, texts),
+            "size_mb": round(os.path.getsize(model_paths[name]) / 2**20, 1),
+            "agreement_with_reference": round(float((y_pred == reference_pred).mean()), 4),
+        }
+
+    timestamp = datetime.now().strftime("%d-%m-%Y-%H-%M-%S")
+    run_dir = os.path.join(run_folder, f"quantization_{timestamp}")
+    os.makedirs(run_dir, exist_ok=True)
+    report_path = os.path.join(run_dir, "quantization_report.json")
+    with open(report_path, "w") as f:
+        json.dump({"samples": n_samples, "torch_threads": torch.get_num_threads(), **report}, f, indent=4)
+    print(json.dumps(report, indent=4))
+    print(f"📄 Saved Quantization Report: {report_path}\n")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the dynamic int8 model and compare it against fp32."
+    )
+    parser.add_argument("--model-path", default=config.BEST_MODEL_PATH)
+    parser.add_argument("--quantized-path", default=config.QUANTIZED_MODEL_PATH)
+    parser.add_argument("--data-path", default=config.DATASET_PATH)
+    parser.add_argument("--samples", type=int, default=2000, help="Rows sampled for the comparison")
+    parser.add_argument("--latency-texts", type=int, default=100)
+    args = parser.parse_args()
+
+    quantize_checkpoint(args.model_path, args.quantized_path)
+
+    tokenizer = AutoTokenizer.from_pretrained(config.TOKENIZER_NAME)
+    index = DatasetIndex.load_or_build(args.data_path)
+    data = prepare_dataframe(
+        index.sample(n=min(args.samples, len(index))), merge_labels=config.MERGE_LABELS
+    ).reset_index(drop=True)
+    # Unshuffled: both variants must see the rows in the same order to compare predictions
+    data_loader = DataLoader(
+        SentimentDataset(data["text"].to_numpy(), data["label_id"].astype(int).to_numpy()),
+        batch_size=config.BATCH_SIZE,
+        collate_fn=TokenizeCollator(tokenizer, config.MAX_LEN),
+    )
+
+    engines = {
+        "fp32": InferenceEngine.from_checkpoint(args.model_path, "cpu"),
+        "int8": InferenceEngine.from_checkpoint(args.quantized_path, "cpu", quantized=True),
+    }
+    compare_models(
+        engines,
+        data_loader,
+        data["text"].astype(str).tolist()[: args.latency_texts],
+        {"fp32": args.model_path, "int8": args.quantized_path},
+    )
+
+
+if __name__ == "__main__":
+    main()
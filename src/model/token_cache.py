@@ -0,0 +1,135 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+
+from typing import Sequence
+from transformers import PreTrainedTokenizerBase
+
+import config
+
+
+def content_hash(texts: Sequence[str]) -> str:
+    """
+    Order-sensitive hash of the dataset texts (vectorized 64-bit row hashes,
+    folded with sha256).
+    """
+    row_hashes = pd.util.hash_pandas_object(
+        pd.Series(texts, dtype=str).reset_index(drop=True), index=False
+    ).to_numpy()
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+
+def cache_key(tokenizer: PreTrainedTokenizerBase, max_len: int, texts: Sequence[str]) -> str:
+    """Cache entry name: tokenizer name, max_len and the content hash of the texts."""
+    tokenizer_name = tokenizer.name_or_path.strip("/").replace("/", "--")
+    return f"{tokenizer_name}-{max_len}-{content_hash(texts)[:20]}"
+
+
+class TokenCache:
+    """
+    Read-only view of a pre-tokenized dataset stored on disk.
+
+    Token ids of all samples are concatenated in one flat memory-mapped array
+    (uint16 when the vocabulary fits) and sample `i` is the slice
+    `input_ids[offsets[i]:offsets[i + 1]]`, so reading it needs no tokenizer call.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+        self.lengths = np.load(os.path.join(path, "lengths.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        if self.meta["n_tokens"]:
+            self.input_ids = np.memmap(
+                os.path.join(path, "input_ids.bin"), dtype=self.meta["dtype"], mode="r"
+            )
+        else:
+            self.input_ids = np.empty(0, dtype=self.meta["dtype"])
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        return self.input_ids[self.offsets[idx] : self.offsets[idx + 1]]
+
+    # Reopen the mmap in DataLoader workers instead of pickling the arrays
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+
+def build_token_cache(
+    texts: Sequence[str],
+    tokenizer: PreTrainedTokenizerBase,
+    max_len: int,
+    path: str,
+    chunk_size: int = 10000,
+) -> TokenCache:
+    """
+    Tokenizes `texts` in chunks with the fast tokenizer and streams the ids to
+    `path`. The entry is written to a temporary folder and renamed at the end,
+    so an interrupted build never leaves a half-written cache behind.
+    """
+    dtype = np.uint16 if len(tokenizer) <= np.iinfo(np.uint16).max + 1 else np.int32
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    os.makedirs(tmp_path, exist_ok=True)
+
+    lengths = np.empty(len(texts), dtype=np.int32)
+    with open(os.path.join(tmp_path, "input_ids.bin"), "wb") as f:
+        for start in range(0, len(texts), chunk_size):
+            encoded = tokenizer(
+                [str(text) for text in texts[start : start + chunk_size]],
+                add_special_tokens=True,
+                truncation=True,
+                max_length=max_len,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+            )["input_ids"]
+            lengths[start : start + len(encoded)] = [len(ids) for ids in encoded]
+            f.write(np.concatenate([np.asarray(ids, dtype=dtype) for ids in encoded]).tobytes())
+
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    np.save(os.path.join(tmp_path, "lengths.npy"), lengths)
+    np.save(os.path.join(tmp_path, "offsets.npy"), offsets)
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump(
+            {
+                "tokenizer": tokenizer.name_or_path,
+                "max_len": max_len,
+                "dtype": np.dtype(dtype).name,
+                "n_samples": len(texts),
+                "n_tokens": int(offsets[-1]),
+            },
+            f,
+            indent=4,
+        )
+
+    if os.path.exists(path):
+        shutil.rmtree(tmp_path)  # another process built it first
+    else:
+        os.replace(tmp_path, path)
+    return TokenCache(path)
+
+
+def load_or_build_token_cache(
+    texts: Sequence[str],
+    tokenizer: PreTrainedTokenizerBase,
+    max_len: int,
+    cache_dir: str = config.TOKEN_CACHE_DIR,
+) -> TokenCache:
+    """Returns the cached tokenization of `texts`, building it on the first call."""
+    path = os.path.join(cache_dir, cache_key(tokenizer, max_len, texts))
+    if os.path.exists(os.path.join(path, "meta.json")):
+        print(f"⚡ Using token cache: {path}")
+        return TokenCache(path)
+
+    print(f"🧱 Building token cache: {path}")
+    os.makedirs(cache_dir, exist_ok=True)
+    return build_token_cache(texts, tokenizer, max_len, path)
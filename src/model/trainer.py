@@ -1,9 +1,14 @@
 import os
 import json
+import math
+import random
+import numpy as np
 import torch
 import torch.nn as nn
 import matplotlib.pyplot as plt
 
+from contextlib import nullcontext
+
 import matplotlib
 
 matplotlib.use("Agg")
@@ -17,7 +22,14 @@ from torch.utils.data import DataLoader
 
 from src.model.evaluate import evaluate
 from src.model.model import SentimentClassifier
-from config import MODEL_TRAINING_OUTPUT_DIR
+from config import (
+    MODEL_TRAINING_OUTPUT_DIR,
+    BEST_MODEL_PATH,
+    HF_REPO_ID,
+    USE_BF16,
+    GRAD_ACCUM_STEPS,
+    LOG_INTERVAL,
+)
 
 from huggingface_hub import HfApi, HfFolder, upload_file
 
@@ -29,39 +41,72 @@ def train_epoch(
     optimizer: AdamW,
     scheduler: torch.optim.lr_scheduler.LambdaLR,
     device: torch.device,
+    use_bf16: bool = USE_BF16,
+    grad_accum_steps: int = GRAD_ACCUM_STEPS,
+    log_interval: int = LOG_INTERVAL,
+    show_progress: bool = True,
 ):
     """
     Trains the model for one epoch.
+
+    Args:
+        use_bf16 (bool): Run forward/loss under bfloat16 autocast (CPU or GPU).
+        grad_accum_steps (int): Batches whose gradients are summed before each
+            optimizer step (effective batch = batch_size * grad_accum_steps).
+            Under DistributedDataParallel, gradients are only all-reduced on
+            the last batch of each window.
+        log_interval (int): Batches between progress-bar updates. Loss and
+            accuracy are accumulated on the device and only read back then.
+        show_progress (bool): Show the tqdm bar (off on non-zero DDP ranks).
     """
     model.train()
-    total_loss, correct_predictions, total_samples = 0, 0, 0
+    device_type = torch.device(device).type
+    total_loss = torch.zeros((), device=device)
+    correct_predictions = torch.zeros((), dtype=torch.long, device=device)
+    total_samples = 0
+    n_batches = len(data_loader)
+
+    optimizer.zero_grad()
+    progress = tqdm(data_loader, desc="Training", disable=not show_progress)
 
     # Loops through training DataLoader (batches of data)
-    for batch in tqdm(data_loader, desc="Training"):
+    for step, batch in enumerate(progress, start=1):
         # Sends data to GPU/CPU (input_ids, attention_mask, labels).
         input_ids = batch["input_ids"].to(device)
         attention_mask = batch["attention_mask"].to(device)
         labels = batch["labels"].to(device)
 
-        optimizer.zero_grad()
-        # Runs the model
-        outputs = model(input_ids=input_ids, attention_mask=attention_mask)
-        
-        # Computes loss (how wrong the predictions are)
-        loss = loss_fn(outputs, labels)
-
-        # Computes gradient
-        loss.backward()
-
-        # Updates model weigths
-        optimizer.step()
-        scheduler.step()
-
-        total_loss += loss.item()
-        correct_predictions += (outputs.argmax(dim=1) == labels).sum().item()
+        window_start = (step - 1) // grad_accum_steps * grad_accum_steps
+        window_size = min(grad_accum_steps, n_batches - window_start)
+        window_end = step - window_start == window_size
+        # DDP: skip the gradient all-reduce until the window's last batch (no_sync
+        # must cover the forward pass too, that's where DDP reads it)
+        sync_context = nullcontext() if window_end or not hasattr(model, "no_sync") else model.no_sync()
+
+        with sync_context:
+            # Runs the model and computes loss (how wrong the predictions are)
+            with torch.autocast(device_type=device_type, dtype=torch.bfloat16, enabled=use_bf16):
+                outputs = model(input_ids=input_ids, attention_mask=attention_mask)
+                loss = loss_fn(outputs, labels)
+
+            # Computes gradient, averaged over the batches of this accumulation window
+            (loss / window_size).backward()
+
+        # Updates model weigths once per accumulation window
+        if window_end:
+            optimizer.step()
+            scheduler.step()
+            optimizer.zero_grad()
+
+        # On-device accumulators: no host sync per step
+        total_loss += loss.detach()
+        correct_predictions += (outputs.argmax(dim=1) == labels).sum()
         total_samples += labels.size(0)
 
-    return total_loss / len(data_loader), correct_predictions / total_samples
+        if step % log_interval == 0:
+            progress.set_postfix(loss=f"{total_loss.item() / step:.4f}")
+
+    return total_loss.item() / n_batches, correct_predictions.item() / total_samples
 
 
 def train_model(
@@ -80,7 +125,7 @@ def train_model(
         "linear",
         optimizer=optimizer,
         num_warmup_steps=0,
-        num_training_steps=len(train_loader) * epochs,
+        num_training_steps=math.ceil(len(train_loader) / GRAD_ACCUM_STEPS) * epochs,
     )
 
     # Create timestamped folder for this training run
@@ -89,7 +134,7 @@ def train_model(
     os.makedirs(run_dir, exist_ok=True)
 
     best_val_acc = 0
-    best_model_path = os.path.join("outputs", "best_model.pth")
+    best_model_path = BEST_MODEL_PATH
     history = {"train_loss": [], "train_acc": [], "val_loss": [], "val_acc": []}
 
     for epoch in range(epochs):
@@ -99,7 +144,7 @@ def train_model(
         train_loss, train_acc = train_epoch(
             model, train_loader, loss_fn, optimizer, scheduler, device
         )
-        val_loss, val_acc, _, _, _ = evaluate(model, val_loader, loss_fn, device)
+        val_loss, val_acc, _, _, _ = evaluate(model, val_loader, loss_fn, device, compiled=False)
 
         print(f"Train Loss: {train_loss:.4f}, Train Accuracy: {train_acc:.4f}")
         print(f"Val   Loss: {val_loss:.4f}, Val   Accuracy: {val_acc:.4f}\n")
@@ -117,27 +162,116 @@ def train_model(
             best_val_acc = val_acc
 
     # --- Push once, at the end of training ---
+    push_model_to_hub(best_model_path)
+
+    save_training_history(history, run_dir)
+
+    return model
+
+
+def save_training_history(history: Dict[str, List[float]], run_dir: str):
+    """
+    Saves the training history as JSON and plots it, in `run_dir`.
+    """
+    history_path = os.path.join(run_dir, "training_history.json")
+    with open(history_path, "w") as f:
+        json.dump(history, f, indent=4)
+    print(f"📄 Saved Training History: {history_path}\n")
+
+    plot_training_results(history, run_dir)
+
+
+def push_model_to_hub(best_model_path: str = BEST_MODEL_PATH):
+    """
+    Uploads `best_model.pth` to the Hugging Face Hub (overwriting the previous one).
+    """
     try:
-        repo_id = "Adelanseur/MLOps-Project"
         upload_file(
             path_or_fileobj=best_model_path,
             path_in_repo="best_model.pth",  # overwrite same file
-            repo_id=repo_id,
+            repo_id=HF_REPO_ID,
             token=HfFolder.get_token()
         )
-        print(f"✅ Final best model uploaded to Hugging Face Hub: {repo_id}/best_model.pth")
+        print(f"✅ Final best model uploaded to Hugging Face Hub: {HF_REPO_ID}/best_model.pth")
     except Exception as e:
         print(f"⚠️ Failed to push model to Hugging Face Hub: {e}")
 
-    # Save training history as JSON
-    history_path = os.path.join(run_dir, "training_history.json")
-    with open(history_path, "w") as f:
-        json.dump(history, f, indent=4)
-    print(f"📄 Saved Training History: {history_path}\n")
 
-    plot_training_results(history, run_dir)
+def get_rng_state() -> Dict:
+    """
+    Captures every RNG used during training (python, numpy, torch, cuda).
+    """
+    return {
+        "python": random.getstate(),
+        "numpy": np.random.get_state(),
+        "torch": torch.get_rng_state(),
+        "cuda": torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None,
+    }
 
-    return model
+
+def set_rng_state(state: Dict):
+    """
+    Restores the RNG states captured by `get_rng_state`.
+    """
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+    if state["cuda"] is not None and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state["cuda"])
+
+
+def save_checkpoint(
+    path: str,
+    model: SentimentClassifier,
+    optimizer: AdamW,
+    scheduler: torch.optim.lr_scheduler.LambdaLR,
+    training_state: Dict,
+):
+    """
+    Saves a full, resumable training checkpoint: model, optimizer, scheduler,
+    RNG states and the caller's progress (`training_state`, e.g. chunk cursor).
+
+    The file is written next to `path` first and then renamed, so a crash while
+    saving never corrupts the previous checkpoint.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    torch.save(
+        {
+            "model": model.state_dict(),
+            "optimizer": optimizer.state_dict(),
+            "scheduler": scheduler.state_dict(),
+            "rng": get_rng_state(),
+            "training_state": training_state,
+        },
+        tmp_path,
+    )
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str, device: torch.device) -> Dict:
+    """
+    Reads a checkpoint written by `save_checkpoint`.
+    """
+    # Our own file: it holds RNG states and python objects, not only tensors
+    return torch.load(path, map_location=device, weights_only=False)
+
+
+def restore_checkpoint(
+    checkpoint: Dict,
+    model: SentimentClassifier,
+    optimizer: AdamW,
+    scheduler: torch.optim.lr_scheduler.LambdaLR,
+) -> Dict:
+    """
+    Restores model, optimizer, scheduler and RNG states in place from a loaded
+    checkpoint and returns its `training_state`.
+    """
+    model.load_state_dict(checkpoint["model"])
+    optimizer.load_state_dict(checkpoint["optimizer"])
+    scheduler.load_state_dict(checkpoint["scheduler"])
+    set_rng_state(checkpoint["rng"])
+    return checkpoint["training_state"]
 
 
 def plot_training_results(history: Dict[str, List[float]], run_dir: str):
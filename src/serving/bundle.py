@@ -0,0 +1,96 @@
+import os
+import argparse
+import torch
+
+from safetensors import safe_open
+from safetensors.torch import save_file
+from transformers import AutoTokenizer, BertConfig
+
+import config
+from src.model.model import SentimentClassifier
+
+WEIGHTS_FILE = "model.safetensors"
+
+
+def is_bundle(path: str) -> bool:
+    """True if `path` is a folder written by `export_serving_bundle`."""
+    return os.path.isfile(os.path.join(path, WEIGHTS_FILE))
+
+
+def export_serving_bundle(
+    model_path: str = config.BEST_MODEL_PATH,
+    bundle_dir: str = config.SERVING_MODEL_DIR,
+) -> str:
+    """
+    Writes a self-contained serving folder for the trained classifier:
+
+    - `config.json`: BERT architecture (no pretrained weights needed to build it)
+    - `model.safetensors`: every tensor of the model, buffers included, with
+      `n_classes` / `dropout_prob` in the metadata
+    - tokenizer files, so serving never goes to the Hub
+
+    Returns:
+        str: `bundle_dir`.
+    """
+    from src.serving.torch_engine import load_classifier
+
+    model = load_classifier(model_path, "cpu")
+    os.makedirs(bundle_dir, exist_ok=True)
+
+    model.bert.config.save_pretrained(bundle_dir)
+    AutoTokenizer.from_pretrained(config.TOKENIZER_NAME).save_pretrained(bundle_dir)
+
+    # Non-persistent buffers (e.g. position_ids) too: loading builds the model on
+    # the meta device, so anything not in the file would stay unallocated
+    tensors = {**model.state_dict(), **dict(model.named_buffers())}
+    save_file(
+        {name: tensor.contiguous() for name, tensor in tensors.items()},
+        os.path.join(bundle_dir, WEIGHTS_FILE),
+        metadata={"n_classes": str(model.fc.out_features), "dropout_prob": str(model.dropout.p)},
+    )
+    print(f"📦 Saved serving bundle: {bundle_dir}")
+    return bundle_dir
+
+
+def load_bundle_classifier(
+    bundle_dir: str = config.SERVING_MODEL_DIR, device: str = config.DEVICE
+) -> SentimentClassifier:
+    """
+    Builds the classifier from the bundled config and assigns the safetensors
+    weights in place: no pretrained download, no random init, no network.
+    """
+    weights_path = os.path.join(bundle_dir, WEIGHTS_FILE)
+    print(f"🔄 Loading model from {weights_path}")
+
+    with safe_open(weights_path, framework="pt", device=str(device)) as f:
+        metadata = f.metadata()
+        tensors = {name: f.get_tensor(name) for name in f.keys()}
+
+    # Parameters are only allocated when the weights are assigned below
+    with torch.device("meta"):
+        model = SentimentClassifier(
+            n_classes=int(metadata["n_classes"]),
+            dropout_prob=float(metadata["dropout_prob"]),
+            bert_config=BertConfig.from_pretrained(bundle_dir),
+        )
+    model.load_state_dict({name: tensors[name] for name in model.state_dict()}, assign=True)
+    for name, buffer in list(model.named_buffers()):
+        if buffer.is_meta:
+            module_name, _, buffer_name = name.rpartition(".")
+            setattr(model.get_submodule(module_name), buffer_name, tensors[name])
+
+    model.eval()
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline serving bundle (safetensors).")
+    parser.add_argument("--model-path", default=config.BEST_MODEL_PATH)
+    parser.add_argument("--bundle-dir", default=config.SERVING_MODEL_DIR)
+    args = parser.parse_args()
+
+    export_serving_bundle(args.model_path, args.bundle_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import logging
+import threading
+import torch
+import torch.nn as nn
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import config
+
+
+class CompiledForward:
+    """
+    Optimized eval-mode forward pass of a SentimentClassifier, with one graph
+    per (batch, sequence-length) bucket.
+
+    Inputs are padded up to their bucket (batch to a power of two up to 4, then
+    to a multiple of 4; sequence to a multiple of `seq_multiple`; padded rows and
+    positions are masked out and dropped from the output), so a bounded set of
+    graphs serves every request.
+
+    - "torchscript": traced, then `torch.jit.freeze`d, which inlines the weights
+      and removes the (eval-mode no-op) dropout from the graph.
+    - "inductor": `torch.compile(dynamic=False)` of the eval-mode model, with
+      inductor's freezing on, so the weights are folded into the graph too.
+
+    Any failure to build or run a bucket's graph logs a warning and that bucket
+    runs eagerly from then on.
+
+    Buckets are built on first use unless `warmup` built them ahead of time
+    (the serving registry does, before it reports ready).
+
+    Graphs capture the weights at build time: build a new CompiledForward after
+    the model is updated (`evaluate()` builds one per call).
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        method: str = config.COMPILE_METHOD,
+        seq_multiple: int = 8,
+        max_len: int = config.MAX_LEN,
+    ):
+        if method not in ("torchscript", "inductor"):
+            raise ValueError(f"Unknown compile method {method!r} (expected 'torchscript' or 'inductor').")
+        self.model = model
+        self.method = method
+        self.seq_multiple = seq_multiple
+        self.max_len = max_len
+        # None marks a bucket that failed to compile and runs eagerly
+        self.graphs: Dict[Tuple[int, int], Optional[nn.Module]] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, batch_size: int, seq_len: int) -> Tuple[int, int]:
+        """Shape that a (batch_size, seq_len) input is padded to."""
+        padded_batch = 1 << (batch_size - 1).bit_length() if batch_size <= 4 else -(-batch_size // 4) * 4
+        padded_seq = -(-seq_len // self.seq_multiple) * self.seq_multiple
+        return padded_batch, max(min(padded_seq, self.max_len), seq_len)
+
+    def warmup(self, batch_sizes: Iterable[int], device: str = "cpu") -> int:
+        """
+        Builds the graph of every bucket that a batch of one of `batch_sizes`
+        texts, of any length up to `max_len`, falls into. Returns how many
+        buckets that is.
+        """
+        keys = sorted({self.bucket(b, s) for b in batch_sizes for s in range(1, self.max_len + 1)})
+        for key in keys:
+            input_ids = torch.zeros(key, dtype=torch.long, device=device)
+            self._graph_for(key, input_ids, torch.ones_like(input_ids))
+        return len(keys)
+
+    def _build(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> nn.Module:
+        self.model.eval()
+        if self.method == "inductor":
+            graph = torch.compile(self.model, dynamic=False)
+            # Compiling happens on the first call. The settings are only patched
+            # for it (under the build lock) rather than set process-wide:
+            # - freezing: inline the weights as constants (needs no_grad)
+            # - cache_size_limit: one dynamo entry per bucket, the default (8)
+            #   would silently send later buckets back to eager mode
+            with torch.no_grad(), torch._inductor.config.patch(freezing=True), \
+                    torch._dynamo.config.patch(cache_size_limit=max(torch._dynamo.config.cache_size_limit, 256)):
+                graph(input_ids, attention_mask)
+            return graph
+        with torch.no_grad():
+            traced = torch.jit.trace(self.model, (input_ids, attention_mask))
+        graph = torch.jit.freeze(traced)
+        # First call does the optimization passes; check it runs at all
+        with torch.no_grad():
+            graph(input_ids, attention_mask)
+        return graph
+
+    def _graph_for(self, key, input_ids, attention_mask) -> Optional[nn.Module]:
+        if key in self.graphs:
+            return self.graphs[key]
+        with self._lock:
+            if key not in self.graphs:
+                try:
+                    self.graphs[key] = self._build(input_ids, attention_mask)
+                    logging.info(f"Compiled {self.method} graph for bucket {key}")
+                except Exception as e:
+                    logging.warning(f"Compiling bucket {key} failed, running it eagerly: {e}")
+                    self.graphs[key] = None
+        return self.graphs[key]
+
+    def __call__(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        batch_size, seq_len = input_ids.shape
+        key = self.bucket(batch_size, seq_len)
+        padded_ids = input_ids.new_zeros(key)
+        padded_mask = attention_mask.new_zeros(key)
+        padded_ids[:batch_size, :seq_len] = input_ids
+        padded_mask[:batch_size, :seq_len] = attention_mask
+        # Fully padded rows would attend to nothing: give them one visible token
+        padded_mask[batch_size:, 0] = 1
+
+        graph = self._graph_for(key, padded_ids, padded_mask)
+        with torch.no_grad():
+            if graph is not None:
+                try:
+                    return graph(padded_ids, padded_mask)[:batch_size]
+                except Exception as e:
+                    logging.warning(f"Compiled bucket {key} failed, running it eagerly: {e}")
+                    self.graphs[key] = None
+            self.model.eval()
+            return self.model(input_ids=input_ids, attention_mask=attention_mask)
@@ -0,0 +1,76 @@
+import numpy as np
+
+from typing import Dict, List
+
+import config
+from src.serving.text import clean_text
+
+
+def get_label_mapping(merge_labels: bool = config.MERGE_LABELS) -> dict:
+    """
+    Returns the class index -> label name mapping the model is trained on:
+    Negative/Neutral/Positive when scores are merged (`prepare_dataframe`),
+    the six score names otherwise. The same rule names the classes in training,
+    evaluation, ONNX exports and the API.
+
+    The classifier head may be wider (`config.N_CLASSES`): only its first
+    `len(mapping)` classes are ever trained, the others are ignored.
+    """
+    sentiment_mapper = (
+        config.SENTIMENT_MAPPING_3_LABEL_VERSION if merge_labels else config.SENTIMENT_MAPPING
+    )
+    return dict(enumerate(sentiment_mapper.values()))
+
+
+class BaseInferenceEngine:
+    """
+    Backend-independent half of an inference engine: raw texts -> probabilities
+    -> response dicts. Subclasses implement `tokenize` and `predict_proba_encoded`.
+
+    Kept free of torch so that backends which don't need it (ONNX Runtime)
+    don't import it.
+    """
+
+    def __init__(self, label_mapping: Dict[int, str], max_len: int = config.MAX_LEN):
+        self.label_mapping = label_mapping
+        self.max_len = max_len
+
+    def clean(self, texts: List[str]) -> List[str]:
+        """Normalizes raw texts the way the training data was cleaned."""
+        return [clean_text(str(text)) for text in texts]
+
+    def tokenize(self, texts: List[str]):
+        """Tokenizes cleaned `texts` into one padded batch (`input_ids`, `attention_mask`)."""
+        raise NotImplementedError
+
+    def encode(self, texts: List[str]):
+        """Cleans and tokenizes `texts` into one padded batch (`input_ids`, `attention_mask`)."""
+        return self.tokenize(self.clean(texts))
+
+    def predict_proba_encoded(self, input_ids, attention_mask) -> np.ndarray:
+        """
+        Returns class probabilities for an already tokenized batch: a softmax
+        over the logits of the `label_mapping` classes only.
+        """
+        raise NotImplementedError
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """Returns class probabilities for raw texts, one row per text."""
+        encoding = self.encode(texts)
+        return self.predict_proba_encoded(encoding["input_ids"], encoding["attention_mask"])
+
+    def format_prediction(self, probabilities: np.ndarray) -> dict:
+        """Maps one probability vector to label, confidence and named probabilities."""
+        prediction = int(np.argmax(probabilities))
+        return {
+            "prediction": prediction,
+            "prediction_label": self.label_mapping[prediction],
+            "confidence": float(probabilities[prediction]),
+            "probabilities": {
+                self.label_mapping[i]: float(p) for i, p in enumerate(probabilities)
+            },
+        }
+
+    def predict(self, texts: List[str]) -> List[dict]:
+        """Predicts label, confidence and probabilities for each text, in order."""
+        return [self.format_prediction(probs) for probs in self.predict_proba(texts)]
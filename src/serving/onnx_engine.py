@@ -0,0 +1,93 @@
+import os
+import json
+import numpy as np
+import onnxruntime as ort
+
+from typing import Dict, List
+from tokenizers import Tokenizer
+
+import config
+from src.serving.engine import BaseInferenceEngine
+
+
+class OnnxInferenceEngine(BaseInferenceEngine):
+    """
+    ONNX Runtime version of InferenceEngine: clean -> tokenize -> run -> softmax,
+    with the same encode / predict_proba_encoded / predict interface.
+
+    Only needs onnxruntime and tokenizers: neither torch nor transformers is
+    imported, so a serving image built for it can leave them out.
+    """
+
+    def __init__(
+        self,
+        session: ort.InferenceSession,
+        tokenizer: Tokenizer,
+        label_mapping: Dict[int, str],
+        max_len: int = config.MAX_LEN,
+    ):
+        """
+        Args:
+            session (ort.InferenceSession): Session over the exported `model.onnx`.
+            tokenizer (Tokenizer): Fast tokenizer, with truncation and padding enabled.
+            label_mapping (Dict[int, str]): Class index -> label name.
+            max_len (int): Maximum sequence length after tokenization.
+        """
+        super().__init__(label_mapping, max_len)
+        self.session = session
+        self.tokenizer = tokenizer
+        self.device = "cpu"
+
+    @classmethod
+    def from_export(
+        cls, export_dir: str = config.ONNX_EXPORT_DIR, num_threads: int = 0
+    ) -> "OnnxInferenceEngine":
+        """
+        Builds an engine from a folder written by `src.model.onnx_export`.
+        `num_threads` sets the session's intra-op threads (0: one per host core).
+        """
+        onnx_path = os.path.join(export_dir, "model.onnx")
+        if not os.path.exists(onnx_path):
+            raise FileNotFoundError(
+                f"No ONNX model at {onnx_path}; build it with `python -m src.model.onnx_export`."
+            )
+        with open(os.path.join(export_dir, "meta.json")) as f:
+            meta = json.load(f)
+
+        tokenizer = Tokenizer.from_file(os.path.join(export_dir, "tokenizer.json"))
+        tokenizer.enable_truncation(max_length=meta["max_len"])
+        tokenizer.enable_padding(pad_id=meta["pad_token_id"], pad_token=meta["pad_token"])
+
+        print(f"🔄 Loading ONNX model from {onnx_path}")
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        label_mapping = {int(i): label for i, label in meta["labels"].items()}
+        return cls(session, tokenizer, label_mapping, meta["max_len"])
+
+    def tokenize(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Tokenizes cleaned `texts` into one batch padded to its longest text."""
+        encodings = self.tokenizer.encode_batch(texts)
+        return {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+        }
+
+    def forward(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Runs the ONNX graph once and returns the logits."""
+        (logits,) = self.session.run(
+            ["logits"],
+            {
+                "input_ids": np.asarray(input_ids, dtype=np.int64),
+                "attention_mask": np.asarray(attention_mask, dtype=np.int64),
+            },
+        )
+        return logits
+
+    def predict_proba_encoded(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Returns class probabilities for an already tokenized batch."""
+        # Untrained head classes (beyond the label map) are left out
+        logits = self.forward(input_ids, attention_mask)[:, : len(self.label_mapping)]
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
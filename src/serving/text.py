@@ -0,0 +1,16 @@
+import re
+import regex
+
+# Compiled once at import. `\W+` -> " " does "remove punctuation" and
+# "remove extra spaces" in a single pass (every whitespace char is also \W).
+URL_PATTERN = re.compile(r"(?:http|www)\S+")
+NON_WORD_PATTERN = re.compile(r"\W+")
+EMOJI_PATTERN = regex.compile(r'\p{Emoji}')
+
+def clean_text(text):
+    text = text.lower()                                # lowercase
+    text = URL_PATTERN.sub('', text)                   # remove URLs
+    text = NON_WORD_PATTERN.sub(" ", text)             # remove punctuation and extra spaces
+    text = EMOJI_PATTERN.sub('', text)                 # remove emoticones
+    # text = " ".join([word for word in text.split() if word not in stop_words])
+    return text
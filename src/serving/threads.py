@@ -0,0 +1,74 @@
+import os
+import sys
+import math
+
+from typing import Optional
+
+import config
+
+# cgroup v2, then v1 (Docker / Kubernetes mount the container's own cgroup here)
+CGROUP_V2_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_V1_CPU_DIRS = ("/sys/fs/cgroup/cpu", "/sys/fs/cgroup/cpu,cpuacct")
+
+
+def cgroup_cpu_quota() -> Optional[float]:
+    """
+    CPU limit of the container in cores (e.g. 1.5 for `limits.cpu: 1500m`),
+    or None when there is no quota.
+    """
+    try:
+        with open(CGROUP_V2_CPU_MAX) as f:
+            quota, period = f.read().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    for cpu_dir in CGROUP_V1_CPU_DIRS:
+        try:
+            with open(os.path.join(cpu_dir, "cpu.cfs_quota_us")) as f:
+                quota = int(f.read())
+            with open(os.path.join(cpu_dir, "cpu.cfs_period_us")) as f:
+                period = int(f.read())
+        except (OSError, ValueError):
+            continue
+        return None if quota <= 0 else quota / period
+    return None
+
+
+def available_cpus() -> int:
+    """
+    Cores this process may actually use: the CPU affinity mask, capped by the
+    cgroup quota. `os.cpu_count()` reports the host's cores, so a pod limited
+    to 2 CPUs on a 64-core node would otherwise run 64 threads and get throttled.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    quota = cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(cpus, 1)
+
+
+def inference_threads(workers: int = config.MAX_WORKERS) -> int:
+    """Intra-op threads per forward pass: INFERENCE_THREADS if set, else the available cores split between workers."""
+    if config.INFERENCE_THREADS > 0:
+        return config.INFERENCE_THREADS
+    return max(available_cpus() // workers, 1)
+
+
+def configure_torch_threads(workers: int = config.MAX_WORKERS) -> int:
+    """
+    Sets torch's intra-op threads to `inference_threads(workers)` and its
+    inter-op threads to 1 (serving runs one forward pass at a time per
+    executor thread). No-op if torch isn't imported (ONNX Runtime backend).
+    Returns the intra-op thread count.
+    """
+    threads = inference_threads(workers)
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return threads
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set before the first inter-op parallel work; keep what we have
+        pass
+    return threads
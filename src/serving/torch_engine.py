@@ -0,0 +1,164 @@
+import os
+import torch
+import torch.nn as nn
+import numpy as np
+
+from typing import Dict, List, Optional
+from transformers import AutoTokenizer, BertConfig, PreTrainedTokenizerBase
+
+import config
+from src.model.model import SentimentClassifier
+from src.serving.bundle import is_bundle, load_bundle_classifier
+from src.serving.compiled import CompiledForward
+from src.serving.engine import BaseInferenceEngine, get_label_mapping
+
+
+def quantize_classifier(model: SentimentClassifier) -> SentimentClassifier:
+    """
+    Dynamic int8 quantization: every nn.Linear (attention, feed-forward and the
+    head) stores int8 weights and quantizes activations on the fly. Embeddings
+    and LayerNorm stay fp32. CPU only.
+    """
+    from torch.ao.quantization import quantize_dynamic
+
+    return quantize_dynamic(model.cpu().eval(), {nn.Linear}, dtype=torch.qint8)
+
+
+def load_classifier(
+    model_path: str = config.BEST_MODEL_PATH,
+    device: str = config.DEVICE,
+    quantized: bool = False,
+) -> SentimentClassifier:
+    """
+    Builds the SentimentClassifier and loads the trained weights in eval mode.
+
+    Falls back to the Hugging Face Hub copy of `best_model.pth` when no local
+    checkpoint exists. `model_path` may also be a serving bundle folder
+    (`src.serving.bundle`), which loads offline without `from_pretrained`.
+
+    Args:
+        quantized (bool): `model_path` is a dynamic int8 artifact written by
+            `src.model.quantize` (CPU only, no Hub fallback).
+    """
+    if not quantized and is_bundle(model_path):
+        return load_bundle_classifier(model_path, device)
+
+    # Initialize model (from the bundled architecture when there is one: no download)
+    bert_config = (
+        BertConfig.from_pretrained(config.SERVING_MODEL_DIR)
+        if is_bundle(config.SERVING_MODEL_DIR)
+        else None
+    )
+    model = SentimentClassifier(
+        n_classes=config.N_CLASSES, dropout_prob=config.DROPOUT, bert_config=bert_config
+    ).to(device)
+
+    if quantized:
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"No int8 model at {model_path}; build it with `python -m src.model.quantize`."
+            )
+        # Same int8 module layout as the saved artifact, then its packed weights
+        model = quantize_classifier(model)
+    elif not os.path.exists(model_path):
+        from huggingface_hub import hf_hub_download
+
+        print("🌐 No local model found, trying to download from Hugging Face Hub...")
+        model_path = hf_hub_download(
+            repo_id=config.HF_REPO_ID,
+            filename="best_model.pth",
+            local_dir=os.path.dirname(model_path) or ".",
+            force_download=False,
+        )
+
+    print(f"🔄 Loading model from {model_path}")
+    # mmap: tensors are paged in from the file instead of read into a second copy
+    model.load_state_dict(torch.load(model_path, map_location=device, mmap=True))
+    model.eval()
+    return model
+
+
+class InferenceEngine(BaseInferenceEngine):
+    """
+    Single-pass inference pipeline: clean -> tokenize -> forward -> softmax.
+
+    Shared by the serving API, `evaluate()` and offline scoring so that logits
+    are computed exactly once per text.
+    """
+
+    def __init__(
+        self,
+        model: SentimentClassifier,
+        tokenizer: Optional[PreTrainedTokenizerBase] = None,
+        label_mapping: Optional[Dict[int, str]] = None,
+        max_len: int = config.MAX_LEN,
+        device: str = config.DEVICE,
+        compiled: bool = False,
+    ):
+        """
+        Args:
+            model (SentimentClassifier): Trained classifier.
+            tokenizer (PreTrainedTokenizerBase): Tokenizer matching the model. Only
+                needed for raw-text methods (`encode`, `predict`, `predict_proba`).
+            label_mapping (Dict[int, str]): Class index -> label name.
+            max_len (int): Maximum sequence length after tokenization.
+            device (str): Device the model runs on.
+            compiled (bool): Run `forward` through per-bucket frozen graphs
+                (`CompiledForward`), falling back to eager mode on failure.
+        """
+        super().__init__(label_mapping or get_label_mapping(), max_len)
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.compiled_forward = CompiledForward(model, max_len=max_len) if compiled else None
+
+    @classmethod
+    def from_checkpoint(
+        cls,
+        model_path: str = config.BEST_MODEL_PATH,
+        device: str = config.DEVICE,
+        quantized: bool = False,
+        compiled: bool = config.COMPILE_INFERENCE,
+    ) -> "InferenceEngine":
+        """
+        Builds an engine from `best_model.pth` (or its int8 variant, or a serving
+        bundle folder) and the matching tokenizer.
+        """
+        if quantized:
+            device = "cpu"
+        tokenizer = AutoTokenizer.from_pretrained(
+            model_path if is_bundle(model_path) else config.TOKENIZER_NAME
+        )
+        model = load_classifier(model_path, device, quantized)
+        return cls(
+            model, tokenizer, get_label_mapping(), device=device, compiled=compiled
+        )
+
+    def tokenize(self, texts: List[str]):
+        """Tokenizes cleaned `texts` into one padded batch."""
+        return self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_len,
+            return_tensors="pt",
+        )
+
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        """Runs the model once in eval mode and returns the logits."""
+        if self.compiled_forward is not None:
+            return self.compiled_forward(input_ids.to(self.device), attention_mask.to(self.device))
+        self.model.eval()
+        with torch.no_grad():
+            return self.model(
+                input_ids=input_ids.to(self.device),
+                attention_mask=attention_mask.to(self.device),
+            )
+
+    def predict_proba_encoded(
+        self, input_ids: torch.Tensor, attention_mask: torch.Tensor
+    ) -> np.ndarray:
+        """Returns class probabilities for an already tokenized batch."""
+        # Untrained head classes (beyond the label map) are left out
+        logits = self.forward(input_ids, attention_mask)[:, : len(self.label_mapping)]
+        return torch.softmax(logits, dim=1).cpu().numpy()
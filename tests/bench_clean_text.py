@@ -0,0 +1,86 @@
+# Benchmark + equivalence check for text cleaning: the original row-by-row
+# clean_text vs the precompiled/vectorized clean_texts (1 and N processes).
+# Fails if any output differs from the original function.
+#
+#   python -m tests.bench_clean_text --rows 500000 --n-jobs 4
+#   python -m tests.bench_clean_text --data-path Dataset/text.txt
+import argparse
+import json
+import os
+import random
+import re
+from time import perf_counter
+
+import pandas as pd
+import regex
+
+from src.model.data_extraction import load_file_by_type
+from src.model.data_processing import clean_texts
+
+
+def reference_clean_text(text):
+    """clean_text as it was before vectorization, kept verbatim as the oracle."""
+    text = text.lower()                                # lowercase
+    text = re.sub(r"http\S+|www\S+|https\S+", '', text) # remove URLs
+    text = re.sub(r"\W", " ", text)                     # remove punctuation
+    text = re.sub(r"\s+", " ", text)                    # remove extra spaces
+    text = regex.compile(r'\p{Emoji}').sub('', text)  # remove emoticones
+    return text
+
+
+PIECES = [
+    "Great", "product!!", "TERRIBLE", "service...", "would buy again", "5 stars",
+    "http://example.com/item?id=42", "see www.shop.com", "https://t.co/xyz", "😀", "👍🏽",
+    "#1", "*****", "©2024", "naïve", "café", "İstanbul", "\t", "\n", "  ", "10/10", "a_b",
+    "ℹ️", "🇫🇷", "can't", "don’t", "—", "1️⃣",
+]
+
+
+def synthetic_texts(n, seed=42):
+    rng = random.Random(seed)
+    return pd.Series(
+        [" ".join(rng.choice(PIECES) for _ in range(rng.randint(1, 30))) for _ in range(n)]
+    )
+
+
+def timed(fn):
+    start = perf_counter()
+    result = fn()
+    return result, round(perf_counter() - start, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--n-jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--data-path", default=None, help="e.g. Dataset/text.txt")
+    args = parser.parse_args()
+
+    if args.data_path:
+        texts = load_file_by_type(args.data_path)["text"].dropna().astype(str)
+    else:
+        texts = synthetic_texts(args.rows)
+
+    expected, apply_s = timed(lambda: texts.apply(reference_clean_text))
+    vectorized, vectorized_s = timed(lambda: clean_texts(texts, n_jobs=1))
+    parallel, parallel_s = timed(
+        lambda: clean_texts(texts, n_jobs=args.n_jobs, chunk_size=max(len(texts) // args.n_jobs, 1))
+    )
+
+    for name, result in (("vectorized", vectorized), ("parallel", parallel)):
+        mismatches = (result != expected).sum()
+        assert mismatches == 0, f"{name}: {mismatches} rows differ from the original clean_text"
+
+    print(json.dumps({
+        "rows": len(texts),
+        "identical_output": True,
+        "original_apply_s": apply_s,
+        "vectorized_s": vectorized_s,
+        f"parallel_{args.n_jobs}_jobs_s": parallel_s,
+        "vectorized_speedup": round(apply_s / vectorized_s, 2),
+        "parallel_speedup": round(apply_s / parallel_s, 2),
+    }, indent=4))
+
+
+if __name__ == "__main__":
+    main()
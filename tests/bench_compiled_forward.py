@@ -0,0 +1,74 @@
+# Benchmark + equivalence check: eager InferenceEngine.forward vs the compiled
+# per-bucket path (TorchScript trace+freeze, torch.compile/inductor) on batches
+# of mixed sizes and lengths, like the API's micro-batches.
+#
+#   python -m tests.bench_compiled_forward --requests 200
+import argparse
+import json
+import random
+from time import perf_counter
+
+import torch
+from transformers import AutoTokenizer
+
+import config
+from src.model.inference import InferenceEngine
+from src.model.model import SentimentClassifier
+from tests.bench_dataloader import synthetic_reviews
+
+
+def run(engine, batches):
+    # Warm-up pass: graphs for every bucket are built here, not timed
+    outputs = [engine.forward(b["input_ids"], b["attention_mask"]) for b in batches]
+    start = perf_counter()
+    for b in batches:
+        engine.forward(b["input_ids"], b["attention_mask"])
+    elapsed = perf_counter() - start
+    n_texts = sum(len(b["input_ids"]) for b in batches)
+    return outputs, {"texts_per_sec": round(n_texts / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-name", default=config.MODEL_NAME)
+    parser.add_argument("--requests", type=int, default=200, help="texts, grouped into random batches")
+    parser.add_argument("--max-batch", type=int, default=config.BATCH_MAX_SIZE)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    tokenizer = AutoTokenizer.from_pretrained(args.model_name)
+    model = SentimentClassifier(n_classes=config.N_CLASSES, model_name=args.model_name).eval()
+    texts = synthetic_reviews(args.requests)
+
+    rng = random.Random(0)
+    eager = InferenceEngine(model, tokenizer, device="cpu")
+    batches, start = [], 0
+    while start < len(texts):
+        size = rng.randint(1, args.max_batch)
+        batches.append(eager.encode(texts[start : start + size]))
+        start += size
+
+    reference, results = None, {}
+    for name, method in (("eager", None), ("torchscript", "torchscript"), ("inductor", "inductor")):
+        engine = InferenceEngine(model, tokenizer, device="cpu", compiled=method is not None)
+        if method:
+            engine.compiled_forward.method = method
+        outputs, results[name] = run(engine, batches)
+        if reference is None:
+            reference = outputs
+        results[name]["max_abs_logit_diff"] = float(
+            max((o - r).abs().max() for o, r in zip(outputs, reference))
+        )
+        if method:
+            graphs = engine.compiled_forward.graphs
+            results[name]["buckets"] = len(graphs)
+            results[name]["eager_fallback_buckets"] = sum(g is None for g in graphs.values())
+
+    baseline = results["eager"]["texts_per_sec"]
+    for result in results.values():
+        result["speedup"] = round(result["texts_per_sec"] / baseline, 2)
+    print(json.dumps({"model": args.model_name, "batches": len(batches), **results}, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Benchmark: real (non-pad) tokens/sec through SentimentClassifier with
+# fixed max_len padding vs per-batch dynamic padding vs length bucketing.
+#
+#   python -m tests.bench_dataloader --samples 2000 --max-len 128
+import argparse
+import json
+import random
+from time import perf_counter
+
+import pandas as pd
+import torch
+from transformers import AutoTokenizer
+
+import config
+from src.model.dataloader import TokenizeCollator, create_dataloader
+from src.model.model import SentimentClassifier
+
+WORDS = "the movie product was great terrible good bad service really not very love hate would buy again".split()
+
+
+def synthetic_reviews(n, seed=42):
+    rng = random.Random(seed)
+    # Long-tailed lengths, like real reviews: mostly short, a few long
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(min(int(rng.expovariate(1 / 15)) + 3, 200)))
+        for _ in range(n)
+    ]
+
+
+def run(model, loader):
+    real_tokens, padded_tokens = 0, 0
+    start = perf_counter()
+    with torch.no_grad():
+        for batch in loader:
+            model(input_ids=batch["input_ids"], attention_mask=batch["attention_mask"])
+            real_tokens += int(batch["attention_mask"].sum())
+            padded_tokens += batch["input_ids"].numel()
+    elapsed = perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "tokens_per_sec": round(real_tokens / elapsed, 1),
+        "pad_fraction": round(1 - real_tokens / padded_tokens, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--max-len", type=int, default=config.MAX_LEN)
+    parser.add_argument("--batch-size", type=int, default=config.BATCH_SIZE)
+    parser.add_argument("--model-name", default=config.MODEL_NAME)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    tokenizer = AutoTokenizer.from_pretrained(args.model_name)
+    model = SentimentClassifier(n_classes=config.N_CLASSES, model_name=args.model_name).eval()
+    df = pd.DataFrame({"text": synthetic_reviews(args.samples), "label_id": 0})
+
+    fixed = create_dataloader(df, tokenizer, args.max_len, args.batch_size, num_workers=0)
+    # The old behaviour: every sample padded to max_len
+    fixed.collate_fn = TokenizeCollator(tokenizer, args.max_len, padding="max_length")
+    dynamic = create_dataloader(df, tokenizer, args.max_len, args.batch_size, num_workers=0)
+    bucketed = create_dataloader(
+        df, tokenizer, args.max_len, args.batch_size, bucket_by_length=True, num_workers=0
+    )
+
+    results = {
+        "max_len_padding": run(model, fixed),
+        "dynamic_padding": run(model, dynamic),
+        "length_bucketing": run(model, bucketed),
+    }
+    baseline = results["max_len_padding"]["tokens_per_sec"]
+    for result in results.values():
+        result["speedup"] = round(result["tokens_per_sec"] / baseline, 2)
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Benchmark: data-parallel CPU training throughput (samples/sec) of train_epoch
+# under gloo DistributedDataParallel, for 1..N local processes.
+#
+#   python -m tests.bench_ddp --world-sizes 1 2 4 8 --samples 4096
+import argparse
+import json
+from time import perf_counter
+
+import pandas as pd
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from torch.nn.parallel import DistributedDataParallel
+from torch.optim import AdamW
+from transformers import AutoTokenizer, get_scheduler
+
+import config
+from src.model.dataloader import create_dataloader
+from src.model.distributed import init_distributed
+from src.model.model import SentimentClassifier
+from src.model.trainer import train_epoch
+from tests.bench_dataloader import synthetic_reviews
+
+
+def worker(rank, world_size, model_name, df, master_port, results):
+    init_distributed(rank, world_size, master_port)
+    torch.manual_seed(0)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    loader = create_dataloader(
+        df, tokenizer, config.MAX_LEN, config.BATCH_SIZE, num_workers=0,
+        world_size=world_size, rank=rank,
+    )
+    model = DistributedDataParallel(
+        SentimentClassifier(n_classes=config.N_CLASSES, model_name=model_name)
+    )
+    optimizer = AdamW(model.parameters(), lr=config.LEARNING_RATE)
+    scheduler = get_scheduler("linear", optimizer=optimizer, num_warmup_steps=0,
+                              num_training_steps=len(loader))
+
+    dist.barrier()
+    start = perf_counter()
+    train_epoch(model, loader, torch.nn.CrossEntropyLoss(), optimizer, scheduler, "cpu",
+                show_progress=False)
+    dist.barrier()
+    elapsed = perf_counter() - start
+
+    if rank == 0:
+        results.put(elapsed)
+    dist.destroy_process_group()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-name", default=config.MODEL_NAME)
+    parser.add_argument("--samples", type=int, default=2048)
+    parser.add_argument("--world-sizes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--master-port", default=config.DDP_MASTER_PORT)
+    args = parser.parse_args()
+
+    df = pd.DataFrame({"text": synthetic_reviews(args.samples), "label_id": 0})
+    results = mp.get_context("spawn").SimpleQueue()
+
+    report = {}
+    for world_size in args.world_sizes:
+        mp.spawn(worker, args=(world_size, args.model_name, df, args.master_port, results),
+                 nprocs=world_size, join=True)
+        report[world_size] = {"samples_per_sec": round(len(df) / results.get(), 1)}
+
+    baseline = report[args.world_sizes[0]]["samples_per_sec"] / args.world_sizes[0]
+    for world_size, result in report.items():
+        result["speedup"] = round(result["samples_per_sec"] / baseline, 2)
+        result["scaling_efficiency"] = round(result["speedup"] / world_size, 2)
+    print(json.dumps({"model": args.model_name, "samples": len(df), "world_sizes": report}, indent=4))
+
+
+if __name__ == "__main__":
+    main()
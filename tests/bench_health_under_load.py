@@ -0,0 +1,89 @@
+# Benchmark: /health latency while the app is busy with predictions. The
+# health probe shares the event loop with /predict, so it must stay fast while
+# forward passes run on the inference executor. Runs the app in-process; the
+# model is the one the registry would serve (config / env).
+#
+#   python -m tests.bench_health_under_load --clients 16 --seconds 20
+#   # compare with forward passes on asyncio's default executor
+#   python -m tests.bench_health_under_load --executor default
+import argparse
+import asyncio
+import json
+import statistics
+from time import perf_counter
+
+import httpx
+
+import src.api.main as api
+from src.api.executor import inference_executor
+from src.serving.threads import available_cpus, cgroup_cpu_quota, inference_threads
+from tests.bench_dataloader import synthetic_reviews
+from tests.bench_load import letters
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(q / 100 * len(values)), len(values) - 1)]
+
+
+async def run(args):
+    if args.executor == "default":
+        api.batcher.executor = None
+        api.inference_executor = None
+
+    await api.app.router.startup()
+    await api.app.state.model_loading
+    texts = synthetic_reviews(1000)
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        stop_at = perf_counter() + args.seconds
+        predictions, health_ms, depths = [0], [], []
+
+        async def predict_client(offset):
+            i = offset
+            while perf_counter() < stop_at:
+                response = await client.post("/predict", json={"text": f"{texts[i % len(texts)]} {letters(i)}"})
+                response.raise_for_status()
+                predictions[0] += 1
+                i += args.clients
+
+        async def health_probe():
+            while perf_counter() < stop_at:
+                start = perf_counter()
+                response = await client.get("/health")
+                health_ms.append((perf_counter() - start) * 1000)
+                assert response.status_code == 200
+                depths.append(inference_executor.queue_depth)
+                await asyncio.sleep(args.probe_interval)
+
+        await asyncio.gather(health_probe(), *(predict_client(c) for c in range(args.clients)))
+    await api.app.router.shutdown()
+
+    return {
+        "executor": args.executor,
+        "clients": args.clients,
+        "available_cpus": available_cpus(),
+        "cgroup_cpu_quota": cgroup_cpu_quota(),
+        "inference_threads": inference_threads(),
+        "predictions_per_sec": round(predictions[0] / args.seconds, 1),
+        "health_probes": len(health_ms),
+        "health_p50_ms": round(statistics.median(health_ms), 2),
+        "health_p99_ms": round(percentile(health_ms, 99), 2),
+        "health_max_ms": round(max(health_ms), 2),
+        "max_executor_queue_depth": max(depths),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16, help="concurrent /predict callers")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    parser.add_argument("--executor", choices=["dedicated", "default"], default="dedicated")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Benchmark: import time of the serving app (`python -X importtime`), in a fresh
+# interpreter per run. Fails if a training-only module leaks into the serving
+# import graph, or if `--max-ms` is given and the median import is slower.
+#
+#   python -m tests.bench_import_time
+#   # transformers' BertModel itself imports sklearn.metrics and torch.hub tqdm
+#   python -m tests.bench_import_time --module src.serving.torch_engine --allow sklearn tqdm
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+
+# Never needed to answer a prediction: only training, plotting or data prep use them
+TRAINING_ONLY = [
+    "matplotlib", "seaborn", "sklearn", "nltk", "pandas", "tqdm",
+    "src.model.trainer", "src.model.evaluate", "src.model.data_processing",
+]
+# Loaded by the registry when the model loads, not when the app is imported
+LAZY = ["torch", "transformers", "onnxruntime"]
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_once(module):
+    """Imports `module` in a fresh interpreter; returns the importtime rows and loaded modules."""
+    code = f"import sys, json, {module}; print(json.dumps(sorted(sys.modules)))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, len(indent) // 2, int(self_us), int(cumulative_us)))
+    return rows, set(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="src.api.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="heaviest top-level imports to list")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail above this median")
+    parser.add_argument("--allow", nargs="*", default=[], help="training-only modules to tolerate")
+    args = parser.parse_args()
+
+    totals, rows, modules = [], [], set()
+    for _ in range(args.runs):
+        rows, modules = import_once(args.module)
+        totals.append(next(c for name, _, _, c in rows if name == args.module) / 1000)
+
+    # Cumulative time of each package first imported at the top level, last run
+    top_level = sorted(
+        ((name, round(c / 1000, 1)) for name, depth, _, c in rows if depth <= 1),
+        key=lambda item: -item[1],
+    )
+    leaked = [m for m in TRAINING_ONLY if m in modules and m not in args.allow]
+    eager = [m for m in LAZY if m in modules]
+    median_ms = round(statistics.median(totals), 1)
+
+    print(json.dumps({
+        "module": args.module,
+        "median_import_ms": median_ms,
+        "min_import_ms": round(min(totals), 1),
+        "modules_loaded": len(modules),
+        "heaviest_imports_ms": dict(top_level[: args.top]),
+        "training_only_modules_loaded": leaked,
+        "lazy_modules_loaded": eager,
+    }, indent=4))
+
+    assert not leaked, f"training-only modules imported by {args.module}: {leaked}"
+    if args.max_ms is not None:
+        assert median_ms <= args.max_ms, f"{args.module} imports in {median_ms} ms > {args.max_ms} ms"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# Load test: throughput, latency percentiles and error rate of the serving API,
+# as one JSON report (with the git commit) to compare serving changes commit by
+# commit. The app runs in-process (httpx ASGI transport, no network), under a
+# local pre-fork uvicorn server, or is an already running server (--url).
+#
+# With --rps, requests are sent open-loop on a fixed schedule and latency is
+# measured from each request's scheduled send time, so time spent waiting for
+# a free connection counts (no coordinated omission). Without it, --concurrency
+# clients each send their next request as soon as the previous one is answered.
+#
+#   python -m tests.bench_load --mode inprocess --concurrency 16 --seconds 30
+#   python -m tests.bench_load --mode uvicorn --workers 2 --rps 50 --seconds 60
+#   # replay recorded texts (.jsonl: one object per line, or .txt: one text per line)
+#   python -m tests.bench_load --texts requests.jsonl --field body --output load_report.json
+#   python -m tests.bench_load --url http://localhost:8000 --endpoint batch --batch-size 32
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from time import perf_counter
+
+import httpx
+
+import config
+from tests.bench_dataloader import synthetic_reviews
+
+
+def load_texts(path, field):
+    """Texts to replay: `field` of each JSON line of a .jsonl file, or each line of a text file."""
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    if path.endswith(".jsonl"):
+        return [str(json.loads(line)[field]) for line in lines]
+    return lines
+
+
+def letters(i):
+    """`i` spelled in letters ("a", "b", ... "ba"): survives clean_text, which drops digits."""
+    word = ""
+    while True:
+        i, digit = divmod(i, 26)
+        word = "abcdefghijklmnopqrstuvwxyz"[digit] + word
+        if i == 0:
+            return word
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(q / 100 * len(values)), len(values) - 1)]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def wait_ready(client, timeout):
+    """Polls /health until the model is loaded (200)."""
+    deadline = perf_counter() + timeout
+    while perf_counter() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError(f"server not ready after {timeout}s")
+
+
+async def run_load(client, args, texts):
+    if args.endpoint == "batch":
+        path = "/predict/batch"
+        payloads = [
+            {"texts": [texts[(i * args.batch_size + j) % len(texts)] for j in range(args.batch_size)]}
+            for i in range(max(len(texts) // args.batch_size, 1))
+        ]
+    else:
+        path = "/predict"
+        payloads = [{"text": text} for text in texts]
+
+    for payload in payloads[: args.warmup]:
+        await client.post(path, json=payload)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, statuses = [], Counter()
+    start = perf_counter()
+    stop_at = start + args.seconds
+
+    async def send(i, scheduled):
+        async with semaphore:
+            try:
+                response = await client.post(path, json=payloads[i % len(payloads)])
+                if args.endpoint == "batch":
+                    await response.aread()  # streamed NDJSON: wait for the last line
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+        statuses[status] += 1
+        if status == 200:
+            # Shed (429) and failed requests return fast: they'd make latency look better
+            latencies.append(perf_counter() - scheduled)
+
+    if args.rps > 0:
+        # Open loop: request i is due at start + i / rps, whatever the server does
+        tasks, i = [], 0
+        while (scheduled := start + i / args.rps) < stop_at:
+            await asyncio.sleep(max(scheduled - perf_counter(), 0))
+            tasks.append(asyncio.create_task(send(i, scheduled)))
+            i += 1
+        await asyncio.gather(*tasks)
+    else:
+        # Closed loop: each of the --concurrency clients sends its next request
+        # as soon as the previous one is answered
+        async def client_loop(offset):
+            i = offset
+            while perf_counter() < stop_at:
+                await send(i, perf_counter())
+                i += args.concurrency
+
+        await asyncio.gather(*(client_loop(c) for c in range(args.concurrency)))
+    elapsed = perf_counter() - start
+
+    n_requests, n_ok = sum(statuses.values()), statuses.get(200, 0)
+    texts_per_request = args.batch_size if args.endpoint == "batch" else 1
+    latencies_ms = [latency * 1000 for latency in latencies]
+    return {
+        "requests": n_requests,
+        "duration_s": round(elapsed, 2),
+        "throughput_rps": round(n_ok / elapsed, 1),
+        "throughput_texts_per_sec": round(n_ok * texts_per_request / elapsed, 1),
+        "error_rate": round(1 - n_ok / max(n_requests, 1), 4),
+        "status_counts": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        # Successful requests only
+        "latency_ms": {
+            "p50": round(percentile(latencies_ms, 50), 2),
+            "p95": round(percentile(latencies_ms, 95), 2),
+            "p99": round(percentile(latencies_ms, 99), 2),
+            "mean": round(statistics.mean(latencies_ms), 2),
+            "max": round(max(latencies_ms), 2),
+        } if latencies_ms else None,
+    }
+
+
+async def run(args, texts):
+    timeout = httpx.Timeout(args.request_timeout)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    if args.mode == "inprocess":
+        import src.api.main as api
+
+        await api.app.router.startup()
+        await api.app.state.model_loading
+        transport = httpx.ASGITransport(app=api.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+                return await run_load(client, args, texts)
+        finally:
+            await api.app.router.shutdown()
+
+    server = None
+    url = args.url
+    if args.mode == "uvicorn":
+        url = f"http://127.0.0.1:{args.port}"
+        server = subprocess.Popen([
+            sys.executable, "-m", "src.api.prefork", "--workers", str(args.workers),
+            "--host", "127.0.0.1", "--port", str(args.port),
+        ])
+    try:
+        async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+            await wait_ready(client, args.startup_timeout)
+            return await run_load(client, args, texts)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the serving API.")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn", "url"], default="inprocess")
+    parser.add_argument("--url", default=None, help="target an already running server (implies --mode url)")
+    parser.add_argument("--workers", type=int, default=config.MAX_WORKERS, help="--mode uvicorn")
+    parser.add_argument("--port", type=int, default=8765, help="--mode uvicorn")
+    parser.add_argument("--endpoint", choices=["predict", "batch"], default="predict")
+    parser.add_argument("--batch-size", type=int, default=32, help="texts per /predict/batch call")
+    parser.add_argument("--texts", default=None, help=".jsonl or .txt file to replay (default: synthetic reviews)")
+    parser.add_argument("--field", default="text", help="JSON field holding the text in a .jsonl file")
+    parser.add_argument("--n-texts", type=int, default=2000, help="synthetic reviews to generate")
+    parser.add_argument("--unique", action="store_true", help="make every text unique (no prediction cache hits)")
+    parser.add_argument("--concurrency", type=int, default=16, help="max requests in flight")
+    parser.add_argument("--rps", type=float, default=0, help="target requests/s (0: closed loop)")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--warmup", type=int, default=10, help="requests sent before timing starts")
+    parser.add_argument("--request-timeout", type=float, default=60)
+    parser.add_argument("--startup-timeout", type=float, default=300)
+    parser.add_argument("--output", default=None, help="also write the JSON report here")
+    args = parser.parse_args()
+    if args.url:
+        args.mode = "url"
+    elif args.mode == "url":
+        parser.error("--mode url needs --url")
+
+    texts = load_texts(args.texts, args.field) if args.texts else synthetic_reviews(args.n_texts)
+    if args.unique:
+        # Enough copies that the run never wraps around to an already cached text
+        texts = [f"{text} {letters(i)}" for i, text in enumerate(texts * 50)]
+
+    results = asyncio.run(run(args, texts))
+    report = {
+        "commit": git_commit(),
+        "mode": args.mode,
+        "endpoint": args.endpoint,
+        "workers": args.workers if args.mode == "uvicorn" else None,
+        "concurrency": args.concurrency,
+        "target_rps": args.rps or None,
+        "texts_source": args.texts or "synthetic",
+        "unique_texts": args.unique,
+        "inference_backend": config.INFERENCE_BACKEND,
+        **results,
+    }
+    print(json.dumps(report, indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Benchmark: memory of the pre-fork server (src.api.prefork). Starts it with N
+# workers, sends some predictions so every worker has run the model, then reads
+# each process's RSS / PSS / shared / private memory from /proc. Sum of RSS is
+# roughly what N independent `uvicorn --workers N` processes would cost (each
+# loads its own copy); sum of PSS is what the pre-fork server really uses.
+#
+#   python -m tests.bench_prefork_memory --workers 4 --requests 200
+import argparse
+import json
+import subprocess
+import sys
+import time
+import urllib.request
+
+from src.api.memory import read_memory
+from tests.bench_dataloader import synthetic_reviews
+
+
+def post(url, payload):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return json.load(response)
+
+
+def wait_ready(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/health", timeout=5) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"server not ready after {timeout}s")
+
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen([
+        sys.executable, "-m", "src.api.prefork",
+        "--workers", str(args.workers), "--host", "127.0.0.1", "--port", str(args.port),
+    ])
+    try:
+        wait_ready(url, args.timeout)
+        for text in synthetic_reviews(args.requests):
+            post(f"{url}/predict", {"text": text})
+
+        workers = {pid: read_memory(pid) for pid in child_pids(server.pid)}
+        parent = read_memory(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    mib = lambda value: round(value / 2**20, 1)
+    total_rss = sum(m["rss"] for m in workers.values()) + parent["rss"]
+    total_pss = sum(m["pss"] for m in workers.values()) + parent["pss"]
+    print(json.dumps({
+        "workers": len(workers),
+        "parent_mib": {kind: mib(value) for kind, value in parent.items()},
+        "worker_mib": {pid: {kind: mib(v) for kind, v in m.items()} for pid, m in workers.items()},
+        "total_rss_mib": mib(total_rss),
+        "total_pss_mib": mib(total_pss),
+        "shared_fraction_of_worker_rss": round(
+            sum(m["shared"] for m in workers.values()) / sum(m["rss"] for m in workers.values()), 2
+        ),
+    }, indent=4))
+
+
+if __name__ == "__main__":
+    main()
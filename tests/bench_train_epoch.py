@@ -0,0 +1,68 @@
+# Benchmark: training throughput (samples/sec) of train_epoch with
+# fp32 vs bf16 autocast, and with gradient accumulation at the same effective batch.
+#
+#   python -m tests.bench_train_epoch --model-name prajjwal1/bert-tiny
+#   python -m tests.bench_train_epoch --model-name bert-base-uncased --samples 256
+import argparse
+import json
+from time import perf_counter
+
+import pandas as pd
+import torch
+from torch.optim import AdamW
+from transformers import AutoTokenizer, get_scheduler
+
+import config
+from src.model.dataloader import create_dataloader
+from src.model.model import SentimentClassifier
+from src.model.trainer import train_epoch
+from tests.bench_dataloader import synthetic_reviews
+
+
+def run(model_name, tokenizer, df, batch_size, use_bf16, grad_accum_steps):
+    torch.manual_seed(0)
+    model = SentimentClassifier(n_classes=config.N_CLASSES, model_name=model_name)
+    loader = create_dataloader(df, tokenizer, config.MAX_LEN, batch_size, num_workers=0)
+    optimizer = AdamW(model.parameters(), lr=config.LEARNING_RATE)
+    scheduler = get_scheduler("linear", optimizer=optimizer, num_warmup_steps=0,
+                              num_training_steps=len(loader))
+
+    start = perf_counter()
+    loss, _ = train_epoch(model, loader, torch.nn.CrossEntropyLoss(), optimizer, scheduler,
+                          "cpu", use_bf16=use_bf16, grad_accum_steps=grad_accum_steps)
+    elapsed = perf_counter() - start
+    return {
+        "batch_size": batch_size,
+        "grad_accum_steps": grad_accum_steps,
+        "bf16": use_bf16,
+        "samples_per_sec": round(len(df) / elapsed, 1),
+        "final_loss": round(loss, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-name", default=config.MODEL_NAME)
+    parser.add_argument("--samples", type=int, default=1024)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    tokenizer = AutoTokenizer.from_pretrained(args.model_name)
+    df = pd.DataFrame({"text": synthetic_reviews(args.samples), "label_id": 0})
+    effective_batch = config.BATCH_SIZE
+
+    results = {
+        "fp32": run(args.model_name, tokenizer, df, effective_batch, False, 1),
+        "bf16": run(args.model_name, tokenizer, df, effective_batch, True, 1),
+        "bf16_accum4": run(args.model_name, tokenizer, df, effective_batch // 4, True, 4),
+    }
+    baseline = results["fp32"]["samples_per_sec"]
+    for result in results.values():
+        result["speedup"] = round(result["samples_per_sec"] / baseline, 2)
+    print(json.dumps({"model": args.model_name, "threads": torch.get_num_threads(), **results}, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-# Test API endpoints using requests
+# Test API endpoints using requests (smoke test; for throughput and latency use `python -m tests.bench_load`)
 import requests
 
 # Health check
@@ -0,0 +1,51 @@
+# DatasetIndex must find the same rows as pandas on CSVs with quoted multi-line
+# texts, escaped quotes ("") and stray quotes inside unquoted texts (my 5" screen).
+#
+#   python -m pytest tests/test_dataset_index.py
+import numpy as np
+import pandas as pd
+
+from src.model.data_extraction import DATA_COLUMNS
+from src.model.dataset_index import DatasetIndex
+
+CSV = (
+    b'text,label\n'
+    b'my 5" screen broke,0\n'
+    b'plain review,1\n'
+    b'"she said ""great"" and left",2\n'
+    b'\n'
+    b'"a review\nover two lines, with a comma",3\n'
+    b'6" tall and 8" wide,4\n'
+    b'"stray "" then\n""quoted"" lines\n",5\n'
+    b'"""quoted start"", then text",1\n'
+    b'last one with a 12" pizza,2\n'
+)
+
+
+def write_csv(tmp_path, content=CSV):
+    path = tmp_path / "reviews.csv"
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_rows_match_pandas(tmp_path):
+    path = write_csv(tmp_path)
+    expected = pd.read_csv(path, usecols=lambda c: c in DATA_COLUMNS)
+
+    index = DatasetIndex.build(path)
+    assert len(index) == len(expected) == 8
+
+    pd.testing.assert_frame_equal(index.read_range(0, len(index)).reset_index(drop=True), expected)
+    assert index.read_rows([0])["text"].tolist() == ['my 5" screen broke']
+    assert index.read_rows([2])["text"].tolist() == ['she said "great" and left']
+
+
+def test_read_rows_in_requested_order(tmp_path):
+    path = write_csv(tmp_path)
+    expected = pd.read_csv(path, usecols=lambda c: c in DATA_COLUMNS)
+    index = DatasetIndex.load_or_build(path)
+
+    rows = np.random.default_rng(0).permutation(len(index))
+    df = index.read_rows(rows)
+    assert df.index.tolist() == rows.tolist()
+    pd.testing.assert_frame_equal(df, expected.iloc[rows])
@@ -1,6 +1,6 @@
 # Test model prediction
-from src.model.trainer import ModelTrainer
+from src.model.inference import InferenceEngine
 
-model = ModelTrainer.load_model()
-prediction = model.predict(["This is a great product!"])
+engine = InferenceEngine.from_checkpoint()
+prediction = engine.predict(["This is a great product!"])
 print(f"Prediction: {prediction}")
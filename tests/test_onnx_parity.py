@@ -0,0 +1,77 @@
+# Parity test: the exported ONNX model must give the same logits as the PyTorch
+# SentimentClassifier on the held-out split, and the ONNX backend's standalone
+# tokenizer the same token ids as the transformers one.
+#
+#   python -m tests.test_onnx_parity --samples 500
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import pytest
+from sklearn.model_selection import train_test_split
+
+import config
+from src.model.data_extraction import prepare_dataframe
+from src.model.dataset_index import DatasetIndex
+from src.model.inference import InferenceEngine
+from src.model.onnx_export import export_onnx
+from src.serving.onnx_engine import OnnxInferenceEngine
+
+ATOL = 1e-4
+
+
+def held_out_texts(data_path, samples):
+    """
+    The first `samples` texts of main2's test split, drawn exactly as main2
+    does (same fraction, seeds and split), so these rows were never trained on.
+    """
+    index = DatasetIndex.load_or_build(data_path)
+    data = prepare_dataframe(
+        index.sample(frac=config.SMALL_FRAC, random_state=42), merge_labels=config.MERGE_LABELS
+    ).reset_index(drop=True)
+    _, test_data = train_test_split(data, test_size=config.TEST_SIZE, random_state=42)
+    return test_data["text"].astype(str).tolist()[:samples]
+
+
+def test_onnx_parity(
+    model_path=config.BEST_MODEL_PATH, data_path=config.DATASET_PATH, samples=2000, batch_size=32
+):
+    for path in (model_path, data_path):
+        if not os.path.exists(path):
+            pytest.skip(f"{path} not found: train a model (src.model.main2) on the dataset first")
+
+    torch_engine = InferenceEngine.from_checkpoint(model_path, "cpu")
+    with tempfile.TemporaryDirectory() as export_dir:
+        export_onnx(model_path, export_dir)
+        onnx_engine = OnnxInferenceEngine.from_export(export_dir)
+
+        texts = held_out_texts(data_path, samples)
+        max_diff = 0.0
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start : start + batch_size]
+            torch_encoding = torch_engine.encode(batch)
+            onnx_encoding = onnx_engine.encode(batch)
+            np.testing.assert_array_equal(onnx_encoding["input_ids"], torch_encoding["input_ids"].numpy())
+            np.testing.assert_array_equal(
+                onnx_encoding["attention_mask"], torch_encoding["attention_mask"].numpy()
+            )
+
+            torch_logits = torch_engine.forward(
+                torch_encoding["input_ids"], torch_encoding["attention_mask"]
+            ).numpy()
+            onnx_logits = onnx_engine.forward(onnx_encoding["input_ids"], onnx_encoding["attention_mask"])
+            np.testing.assert_allclose(onnx_logits, torch_logits, atol=ATOL, rtol=0)
+            max_diff = max(max_diff, float(np.abs(onnx_logits - torch_logits).max()))
+
+    print(f"✅ ONNX parity on {len(texts)} held-out texts: max |logit diff| = {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-path", default=config.BEST_MODEL_PATH)
+    parser.add_argument("--data-path", default=config.DATASET_PATH)
+    parser.add_argument("--samples", type=int, default=2000)
+    args = parser.parse_args()
+
+    test_onnx_parity(args.model_path, args.data_path, args.samples)